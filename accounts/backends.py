@@ -0,0 +1,55 @@
+import uuid
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+PERMISSIONS_TIMEOUT = 60 * 60 * 24
+
+
+def permissions_version_key(user_id):
+    return f"accounts:permissions:version:{user_id}"
+
+
+def bump_permissions_version(user_ids):
+    """
+    Make the cached permission sets of these users stale once the
+    surrounding transaction commits. Bumping earlier would let a request
+    running in between cache the permissions it still reads from before
+    the change under the new version.
+    """
+    # Resolved now: pre_delete and pre_clear callers pass lazy querysets
+    keys = [permissions_version_key(user_id) for user_id in user_ids]
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def permissions_cache_key(user):
+    version = cache.get_or_set(
+        permissions_version_key(user.pk), lambda: uuid.uuid4().hex, timeout=None
+    )
+    return f"accounts:permissions:{user.pk}:{version}:{int(user.is_superuser)}"
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose resolved permission set is also kept in the shared
+    Redis cache (settings.CACHES), so steady-state requests check
+    permissions without a single query. Each user's entry is versioned;
+    accounts.signals bumps the version when their permissions change.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = permissions_cache_key(user_obj)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, PERMISSIONS_TIMEOUT)
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
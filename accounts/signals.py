@@ -0,0 +1,61 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from .backends import bump_permissions_version
+from .models import CustomUser
+
+CHANGING_ACTIONS = ("post_add", "post_remove", "pre_clear", "post_clear")
+
+
+def group_member_ids(group_ids):
+    return CustomUser.objects.filter(groups__in=group_ids).values_list("id", flat=True)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        bump_permissions_version([instance.pk])
+    elif action == "pre_clear":
+        # pk_set is not given on clear: bump the current members beforehand
+        bump_permissions_version(instance.user_set.values_list("id", flat=True))
+    else:
+        bump_permissions_version(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in CHANGING_ACTIONS:
+        return
+    if not reverse:
+        group_ids = [instance.pk]
+    elif action == "pre_clear":
+        group_ids = list(instance.group_set.values_list("id", flat=True))
+    else:
+        group_ids = pk_set or []
+    bump_permissions_version(group_member_ids(group_ids))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    bump_permissions_version(group_member_ids([instance.pk]))
+
+
+@receiver(pre_delete, sender=Permission)
+def permission_deleted(sender, instance, **kwargs):
+    bump_permissions_version(
+        CustomUser.objects.filter(user_permissions=instance).values_list(
+            "id", flat=True
+        )
+    )
+    bump_permissions_version(group_member_ids(instance.group_set.all()))
+
+
+@receiver(post_save, sender=CustomUser)
+def user_created(sender, instance, created, **kwargs):
+    # A new user must not inherit an entry left by an earlier user row
+    if created:
+        bump_permissions_version([instance.pk])
@@ -3,6 +3,8 @@
 import pytest
 from django.urls import reverse
 from django.contrib.auth.models import Permission, Group
+from django.core.cache import cache
+from accounts.backends import permissions_version_key
 from accounts.models import Department, CustomUser
 
 
@@ -256,3 +258,74 @@ class TestUserManagement:
 def test_logout_requires_login(client):
     response = client.get(reverse("logout"))
     assert response.status_code == 302  # Redirects to login
+
+
+@pytest.mark.django_db
+class TestCachedModelBackend:
+    @pytest.fixture
+    def group(self, db):
+        group = Group.objects.create(name="Viewer")
+        group.permissions.add(Permission.objects.get(codename="view_department"))
+        return group
+
+    @pytest.fixture
+    def member(self, group):
+        user = CustomUser.objects.create(username="member")
+        user.groups.add(group)
+        return user
+
+    def reload(self, user):
+        return CustomUser.objects.get(pk=user.pk)
+
+    def test_permissions_are_served_from_cache(self, member, django_assert_num_queries):
+        assert self.reload(member).has_perm("accounts.view_department")
+
+        user = self.reload(member)
+        with django_assert_num_queries(0):
+            assert user.has_perm("accounts.view_department")
+            assert not user.has_perm("accounts.change_department")
+
+    @pytest.fixture
+    def committed(self, django_capture_on_commit_callbacks):
+        return lambda: django_capture_on_commit_callbacks(execute=True)
+
+    def test_group_permission_change_reaches_members(self, member, group, committed):
+        assert not self.reload(member).has_perm("accounts.change_department")
+
+        with committed():
+            group.permissions.add(Permission.objects.get(codename="change_department"))
+        assert self.reload(member).has_perm("accounts.change_department")
+
+        with committed():
+            group.permissions.clear()
+        assert not self.reload(member).has_perm("accounts.view_department")
+
+    def test_membership_change_is_picked_up(self, member, group, committed):
+        assert self.reload(member).has_perm("accounts.view_department")
+
+        with committed():
+            group.user_set.remove(member)
+        assert not self.reload(member).has_perm("accounts.view_department")
+
+    def test_deleted_group_no_longer_grants(self, member, group, committed):
+        assert self.reload(member).has_perm("accounts.view_department")
+
+        with committed():
+            group.delete()
+        assert not self.reload(member).has_perm("accounts.view_department")
+
+    def test_version_is_bumped_on_commit(
+        self, member, group, django_capture_on_commit_callbacks
+    ):
+        assert self.reload(member).has_perm("accounts.view_department")
+        version = cache.get(permissions_version_key(member.pk))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            group.user_set.remove(member)
+            # Readers before the commit still see the old permissions
+            assert cache.get(permissions_version_key(member.pk)) == version
+        for callback in callbacks:
+            callback()
+
+        assert cache.get(permissions_version_key(member.pk)) != version
+        assert not self.reload(member).has_perm("accounts.view_department")
@@ -9,11 +9,14 @@ from .models import (
     Month,
     TaskRemark,
     RegulatoryPublication,
+    TaskPopulationRun,
+    TaskSummary,
 )
 
 
 admin.site.register(Month)
 admin.site.register(RegulatoryPublication)
+admin.site.register(TaskPopulationRun)
 
 
 @admin.register(TaskRemark)
@@ -90,3 +93,32 @@ class TaskAdmin(admin.ModelAdmin):
         if obj.due_date is None:
             return "-"
         return obj.due_date.strftime("%d/%m/%Y")
+
+
+@admin.register(TaskSummary)
+class TaskSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "department",
+        "current_status",
+        "type_of_compliance",
+        "due_date",
+        "awaiting_board_meeting",
+        "task_count",
+    )
+    list_filter = (
+        "department",
+        "current_status",
+        "type_of_compliance",
+        ("due_date", admin.DateFieldListFilter),
+        "awaiting_board_meeting",
+    )
+
+    # Derived from the tasks: rebuild_task_summary is the only way to fix it
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,164 @@
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from auditlog.models import LogEntry
+
+# LogEntry columns kept in the archive
+ARCHIVED_FIELDS = [
+    "id",
+    "object_pk",
+    "object_id",
+    "object_repr",
+    "action",
+    "changes",
+    "changes_text",
+    "actor_id",
+    "actor_email",
+    "cid",
+    "remote_addr",
+    "remote_port",
+    "timestamp",
+    "additional_data",
+]
+
+
+@dataclass
+class AuditRecord:
+    """A LogEntry, read either from the database or from the archive."""
+
+    id: int
+    timestamp: datetime
+    action: int
+    changes: dict = field(default_factory=dict)
+    actor_id: int | None = None
+    actor_email: str | None = None
+    object_repr: str = ""
+    archived: bool = False
+    actor: object = None
+
+    @property
+    def action_label(self):
+        return dict(LogEntry.Action.choices)[self.action]
+
+
+def archive_root():
+    return Path(settings.AUDITLOG_ARCHIVE_ROOT)
+
+
+def archive_dir(content_type):
+    """One directory per model, holding one gzipped JSONL file per month."""
+    return archive_root() / f"{content_type.app_label}.{content_type.model}"
+
+
+def archive_log_entries(cutoff, batch_size=5000):
+    """
+    Move LogEntry rows older than `cutoff` into the archive, a batch at a
+    time. Each batch is appended (as a new gzip member) and synced to disk
+    before its rows are deleted, so a crash can at worst archive a batch
+    twice; readers drop the duplicate ids. Returns the number moved.
+    """
+    content_types = {}
+    moved = 0
+    while True:
+        batch = list(
+            LogEntry.objects.filter(timestamp__lt=cutoff)
+            .order_by("id")
+            .values("content_type_id", *ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return moved
+
+        partitions = {}
+        for row in batch:
+            content_type_id = row.pop("content_type_id")
+            if content_type_id not in content_types:
+                content_types[content_type_id] = ContentType.objects.get_for_id(
+                    content_type_id
+                )
+            key = (content_type_id, row["timestamp"].strftime("%Y-%m"))
+            partitions.setdefault(key, []).append(row)
+
+        for (content_type_id, month), rows in partitions.items():
+            directory = archive_dir(content_types[content_type_id])
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(directory / f"{month}.jsonl.gz", "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                    for row in rows:
+                        line = json.dumps(row, cls=DjangoJSONEncoder)
+                        archive.write(line.encode() + b"\n")
+                raw.flush()
+                os.fsync(raw.fileno())
+
+        with transaction.atomic():
+            LogEntry.objects.filter(id__in=[row["id"] for row in batch]).delete()
+        moved += len(batch)
+
+
+def archived_log_entries(model, object_pk):
+    """Archived entries of one object, scanning only its model's files."""
+    directory = archive_dir(ContentType.objects.get_for_model(model))
+    if not directory.is_dir():
+        return []
+
+    object_pk = str(object_pk)
+    records = {}
+    for path in sorted(directory.glob("*.jsonl.gz")):
+        with gzip.open(path, "rt") as archive:
+            for line in archive:
+                row = json.loads(line)
+                if row["object_pk"] != object_pk:
+                    continue
+                records[row["id"]] = AuditRecord(
+                    id=row["id"],
+                    timestamp=datetime.fromisoformat(row["timestamp"]),
+                    action=row["action"],
+                    changes=row["changes"] or {},
+                    actor_id=row["actor_id"],
+                    actor_email=row["actor_email"],
+                    object_repr=row["object_repr"],
+                    archived=True,
+                )
+    return list(records.values())
+
+
+def audit_history(obj, include_archived=False):
+    """
+    Audit trail of `obj`, newest first. Only the live LogEntry table is
+    read unless `include_archived` asks for the archive as well.
+    """
+    records = [
+        AuditRecord(
+            id=entry.id,
+            timestamp=entry.timestamp,
+            action=entry.action,
+            changes=entry.changes or {},
+            actor_id=entry.actor_id,
+            actor_email=entry.actor_email,
+            object_repr=entry.object_repr,
+            actor=entry.actor,
+        )
+        for entry in LogEntry.objects.get_for_object(obj).select_related("actor")
+    ]
+
+    if include_archived:
+        archived = archived_log_entries(type(obj), obj.pk)
+        actors = get_user_model().objects.in_bulk(
+            {record.actor_id for record in archived if record.actor_id}
+        )
+        for record in archived:
+            record.actor = actors.get(record.actor_id)
+        records += archived
+
+    return sorted(
+        records, key=lambda record: (record.timestamp, record.id), reverse=True
+    )
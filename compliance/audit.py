@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from auditlog.cid import get_cid
+from auditlog.context import set_actor
+from auditlog.models import LogEntry
+
+from .models import TaskStatusTransition
+
+
+def log_bulk_summary(model, message, **additional_data):
+    """
+    Record one LogEntry summarising a bulk change to many `model` rows,
+    instead of one entry per row. The actor is filled in by auditlog when
+    called inside `acting_as` (or a request handled by AuditlogMiddleware).
+    """
+    return LogEntry.objects.create(
+        content_type=ContentType.objects.get_for_model(model),
+        object_pk="",
+        object_repr=message,
+        action=LogEntry.Action.UPDATE,
+        changes_text=message,
+        additional_data=additional_data,
+    )
+
+
+def log_bulk_updates(model, changes, actor=None):
+    """
+    Write one UPDATE LogEntry per changed `model` row with a single
+    bulk_create. `changes` maps each primary key to an (object repr,
+    {field: [old, new]}) pair, the shape auditlog's own diffs use.
+    """
+    actor = actor or current_actor()
+    content_type = ContentType.objects.get_for_model(model)
+    cid = get_cid()
+    return LogEntry.objects.bulk_create(
+        LogEntry(
+            content_type=content_type,
+            object_pk=str(pk),
+            object_id=pk,
+            object_repr=object_repr,
+            action=LogEntry.Action.UPDATE,
+            changes={name: [str(old), str(new)] for name, (old, new) in diff.items()},
+            actor=actor,
+            actor_email=getattr(actor, "email", None),
+            cid=cid,
+        )
+        for pk, (object_repr, diff) in changes.items()
+    )
+
+
+# Who compliance's own audit records (bulk LogEntry rows, status history) are
+# attributed to; auditlog keeps its actor for its per-save entries separately
+_actor = ContextVar("compliance_audit_actor", default=None)
+
+
+@contextmanager
+def actor_context(user):
+    """Attribute compliance's own audit records made in this block to `user`."""
+    token = _actor.set(user)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+@contextmanager
+def acting_as(user):
+    """
+    auditlog's set_actor for code outside a request (commands, tests):
+    attributes auditlog's per-save entries and compliance's own audit
+    records alike to `user`.
+    """
+    with set_actor(user), actor_context(user):
+        yield
+
+
+def current_actor():
+    """The authenticated user set by `actor_context`, if any."""
+    actor = _actor.get()
+    if actor is not None and actor.is_authenticated:
+        return actor
+    return None
+
+
+def record_status_transitions(from_statuses, to_status, actor=None):
+    """
+    Write the status history of tasks whose status changed to `to_status`
+    in bulk; `from_statuses` maps each task id to its previous status.
+    """
+    actor = actor or current_actor()
+    now = timezone.now()
+    return TaskStatusTransition.objects.bulk_create(
+        TaskStatusTransition(
+            task_id=task_id,
+            from_status=from_status,
+            to_status=to_status,
+            actor_id=actor.pk if actor else None,
+            timestamp=now,
+        )
+        for task_id, from_status in from_statuses.items()
+    )
@@ -0,0 +1,95 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localdate
+
+from .models import TaskSummary
+
+# Safety net only: the scope version in the key changes whenever tasks
+# change, and the date in the key rolls every scope over at midnight.
+TASK_COUNTS_TIMEOUT = 60 * 60
+
+
+def task_counts_scope(department_id=None, unscoped=False):
+    return "all" if unscoped else f"department-{department_id}"
+
+
+def task_counts_cache_key(scope, today):
+    return f"task_counts:{scope}:{task_scope_version(scope)}:{today.isoformat()}"
+
+
+def task_scope_version_key(scope):
+    return f"task_scope_version:{scope}"
+
+
+def task_scope_version(scope):
+    """Token that changes whenever any task of the scope changes."""
+    return cache.get_or_set(
+        task_scope_version_key(scope), lambda: uuid.uuid4().hex, timeout=None
+    )
+
+
+def aggregate_task_counts(scope, department_id, today):
+    """Reads the TaskSummary rows of the scope, not compliance_task itself."""
+    qs = TaskSummary.objects.all()
+    if scope != "all":
+        qs = qs.filter(department_id=department_id)
+
+    def total(condition):
+        return Coalesce(Sum("task_count", filter=condition), 0)
+
+    return qs.aggregate(
+        pending_tasks_count=total(Q()),
+        approval_pending_count=total(Q(current_status="to_be_approved")),
+        revision_count=total(Q(current_status="revision")),
+        review_count=total(Q(current_status="review")),
+        due_today_count=total(Q(current_status="pending", due_date=today)),
+        overdue_count=total(Q(current_status="pending", due_date__lt=today)),
+        upcoming_count=total(
+            Q(current_status="pending")
+            & (Q(due_date__gt=today) | Q(due_date__isnull=True))
+        ),
+        board_meeting_pending_count=total(Q(awaiting_board_meeting=True)),
+    )
+
+
+def get_task_counts(department_id=None, unscoped=False):
+    """
+    Sidebar counters for one scope (a department, or every task), shared by
+    all users of that scope. Falls back to the aggregate on a cache miss.
+    """
+    today = localdate()
+    scope = task_counts_scope(department_id, unscoped)
+    # Versioned before aggregating: counts read ahead of a commit are cached
+    # under the version that commit replaces
+    key = task_counts_cache_key(scope, today)
+
+    counts = cache.get(key)
+    if counts is None:
+        counts = aggregate_task_counts(scope, department_id, today)
+        cache.set(key, counts, TASK_COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_task_counts(department_ids):
+    """
+    Bump the version token of `department_ids` and of the unscoped total,
+    which retires their cached counters.
+
+    Done once the surrounding transaction commits: a request running in
+    between would otherwise cache the counts it still reads from before the
+    change under the new token.
+    """
+    scopes = [task_counts_scope(unscoped=True)]
+    scopes += [task_counts_scope(department_id) for department_id in department_ids]
+
+    def invalidate():
+        cache.set_many(
+            {task_scope_version_key(scope): uuid.uuid4().hex for scope in scopes},
+            timeout=None,
+        )
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,108 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    The inclusive (start, end) of a single byte range in a Range header.
+
+    Returns None when the whole file should be sent (no header, several
+    ranges or a malformed one, all of which may be ignored) and False when
+    the range lies outside the file.
+    """
+    match = RANGE_RE.match(header.replace(" ", "")) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last `last` bytes, of which an empty file has none
+        if int(last) == 0 or size == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return False
+    if start > end:
+        return None
+    return start, end
+
+
+def read_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def serve_file(request, field_file):
+    """
+    Response delivering `field_file` once the caller has checked access.
+
+    With SENDFILE_HEADER set the front web server does the transfer and the
+    worker returns at once: "X-Accel-Redirect" (nginx) points at the file
+    under SENDFILE_URL, an internal location aliasing MEDIA_ROOT, and
+    "X-Sendfile" (Apache, lighttpd) gives its absolute path. Both servers
+    handle Range requests themselves. Without it (local development) the
+    file is streamed from Django, honouring single byte ranges.
+    """
+    name = field_file.name
+    storage = field_file.storage
+    filename = os.path.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    header = settings.SENDFILE_HEADER
+    if header:
+        response = HttpResponse(content_type=content_type)
+        if header == "X-Accel-Redirect":
+            response[header] = settings.SENDFILE_URL + quote(name)
+        else:
+            response[header] = storage.path(name)
+        response["Content-Disposition"] = content_disposition_header(False, filename)
+        return response
+
+    try:
+        f = storage.open(name, "rb")
+    except FileNotFoundError:
+        raise Http404("The document no longer exists.")
+    size = storage.size(name)
+    last_modified = http_date(storage.get_modified_time(name).timestamp())
+
+    byte_range = parse_range(request.headers.get("Range"), size)
+    if request.headers.get("If-Range", last_modified) != last_modified:
+        # The client's partial copy is of an older version of the file
+        byte_range = None
+
+    if byte_range is None:
+        response = FileResponse(f, content_type=content_type, filename=filename)
+    elif byte_range is False:
+        f.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            read_range(f, start, end - start + 1), status=206, content_type=content_type
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = content_disposition_header(False, filename)
+
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = last_modified
+    return response
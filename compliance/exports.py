@@ -0,0 +1,112 @@
+import csv
+import tempfile
+from contextlib import ExitStack
+from datetime import date
+
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from .models import Task
+from .pagination import keyset_ordering
+
+# (header, values_list lookup) of each exported column
+EXPORT_COLUMNS = [
+    ("Type of compliance", "type_of_compliance"),
+    ("Department", "department__department_name"),
+    ("Task name", "task_name"),
+    ("Return number", "return_number"),
+    ("Status", "current_status"),
+    ("Priority", "priority"),
+    ("Due date", "due_date"),
+    ("Date of submission", "date_of_document_forwarded"),
+]
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_CHUNK_SIZE = 2000
+
+DISPLAY_CHOICES = {
+    lookup: dict(Task._meta.get_field(lookup).flatchoices)
+    for lookup in ["type_of_compliance", "current_status", "priority"]
+}
+
+
+def export_rows(qs, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple per task of `qs`, in list order, with choice values
+    replaced by their labels. Rows are fetched `chunk_size` at a time.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    choices = [DISPLAY_CHOICES.get(lookup) for lookup in lookups]
+    rows = (
+        qs.order_by(*keyset_ordering())
+        .values_list(*lookups)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield tuple(
+            labels.get(value, value) if labels else value
+            for labels, value in zip(choices, row)
+        )
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(qs, filename):
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow([header for header, _ in EXPORT_COLUMNS])
+        for row in export_rows(qs):
+            yield writer.writerow(
+                [
+                    value.strftime("%d/%m/%Y") if isinstance(value, date) else value
+                    for value in row
+                ]
+            )
+
+    return StreamingHttpResponse(
+        lines(),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+    )
+
+
+def xlsx_response(qs, filename):
+    """
+    Rows go through an openpyxl write-only worksheet, which spools them to
+    disk, and the finished workbook is streamed back from a temporary file.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Tasks")
+    sheet.append([header for header, _ in EXPORT_COLUMNS])
+
+    def cell(value):
+        if not isinstance(value, date):
+            return value
+        date_cell = WriteOnlyCell(sheet, value=value)
+        date_cell.number_format = "DD/MM/YYYY"
+        return date_cell
+
+    for row in export_rows(qs):
+        sheet.append([cell(value) for value in row])
+
+    with ExitStack() as stack:
+        output = stack.enter_context(tempfile.TemporaryFile())
+        workbook.save(output)
+        output.seek(0)
+        response = FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type=(
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            ),
+        )
+        # The response closes the file once it has been sent
+        stack.pop_all()
+    return response
@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate, make_aware
+
+from auditlog.models import LogEntry
+
+from compliance.archive import archive_log_entries
+
+
+class Command(BaseCommand):
+    help = (
+        "Move audit log entries older than a cutoff out of the auditlog_logentry "
+        "table into gzipped JSONL files under AUDITLOG_ARCHIVE_ROOT, one file "
+        "per model and month. Archived entries stay readable from the task "
+        "audit trail page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Archive entries older than this many days (default: 365)",
+        )
+        parser.add_argument(
+            "--before",
+            dest="before",
+            help="Archive entries logged before this date (format: DD/MM/YYYY)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of entries moved per batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many entries would be archived",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                cutoff_date = datetime.strptime(options["before"], "%d/%m/%Y").date()
+            except ValueError:
+                raise CommandError(
+                    f"Invalid date {options['before']!r}, expected DD/MM/YYYY"
+                )
+        else:
+            cutoff_date = localdate() - timedelta(days=options["days"])
+        cutoff = make_aware(datetime.combine(cutoff_date, time.min))
+
+        if options["dry_run"]:
+            count = LogEntry.objects.filter(timestamp__lt=cutoff).count()
+            self.stdout.write(
+                f"{count} entries logged before {cutoff_date:%d/%m/%Y} "
+                "would be archived."
+            )
+            return
+
+        moved = archive_log_entries(cutoff, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {moved} entries logged before {cutoff_date:%d/%m/%Y} "
+                f"to {settings.AUDITLOG_ARCHIVE_ROOT}."
+            )
+        )
@@ -0,0 +1,296 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.timezone import localdate
+
+from accounts.models import Department
+from compliance.models import Task, TaskSummary, Template
+from compliance.pagination import keyset_ordering, segment_after
+from compliance.summary import rebuild_task_summary, summary_rows
+from compliance.views import (
+    TaskApprovalPendingListView,
+    TaskBoardMeetingPendingListView,
+    TaskListView,
+    TaskReviewListView,
+    TaskRevisionListView,
+    TaskSubmittedListView,
+)
+
+# (label, view class, date filter) for every task list page
+LIST_VIEWS = [
+    ("pending", TaskListView, None),
+    ("due-today", TaskListView, "due-today"),
+    ("overdue", TaskListView, "overdue"),
+    ("upcoming", TaskListView, "upcoming"),
+    ("submitted", TaskSubmittedListView, None),
+    ("revision", TaskRevisionListView, None),
+    ("review", TaskReviewListView, None),
+    ("approval-pending", TaskApprovalPendingListView, None),
+    ("board-meeting", TaskBoardMeetingPendingListView, None),
+]
+
+# Templates seeded per department: board meeting returns are a minority
+TEMPLATE_DUE_DATE_TYPES = [
+    *["calendar"] * 8,
+    *["working"] * 6,
+    "board_meeting",
+    "board_meeting_conditional",
+]
+
+# Scans every benchmarked query has to use. A bitmap scan or a sequential
+# scan means the query does not walk an index in the order it needs.
+REQUIRED_SCANS = {"Index Scan", "Index Only Scan"}
+# ...except where no index can do better: a bitmap scan passes for a list
+# short enough to be read and sorted whole (at most SMALL_RESULT_ROWS rows
+# expected), a sequential scan for a query reading at least
+# LARGE_RESULT_SHARE of the table (the submitted history, say).
+BITMAP_SCANS = {"Bitmap Heap Scan", "Bitmap Index Scan"}
+SMALL_RESULT_ROWS = 500
+LARGE_RESULT_SHARE = 0.5
+BENCHMARK_TABLES = {Task._meta.db_table, TaskSummary._meta.db_table}
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a throwaway test database, seed it with a synthetic task table "
+        "(1M rows by default), VACUUM ANALYZE it and EXPLAIN every task list "
+        "and counter query, failing unless each one reads compliance_task and "
+        "compliance_tasksummary through an Index Scan or Index Only Scan "
+        "(bar a bitmap scan of a few hundred rows or a sequential scan of most "
+        "of the table, where no index does better). PostgreSQL only; the "
+        "configured database itself is never written to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--departments", type=int, default=25)
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Replace a leftover test database without asking",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The index benchmark needs a PostgreSQL database.")
+
+        # The same throwaway database the test runner uses ("test_" + NAME),
+        # dropped again afterwards
+        database_name = connection.settings_dict["NAME"]
+        try:
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=not options["interactive"], serialize=False
+            )
+            # Seeded outside a transaction: index-only scans need the
+            # visibility map that VACUUM only sets for committed rows
+            department_ids = self.seed(options["rows"], options["departments"])
+            failures = self.check_plans(department_ids[0])
+        finally:
+            self.drop_test_db(database_name)
+
+        if failures:
+            raise CommandError(
+                f"{len(failures)} quer(ies) do not use an index scan: "
+                + ", ".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("Every query plan passed."))
+
+    def drop_test_db(self, database_name):
+        """
+        Drop the test database, if create_test_db got as far as switching
+        the connection to it, and point the connection back at
+        `database_name` even if dropping fails.
+        """
+        if connection.settings_dict["NAME"] == database_name:
+            return
+        try:
+            connection.creation.destroy_test_db(database_name, verbosity=0)
+        finally:
+            settings.DATABASES[connection.alias]["NAME"] = database_name
+            connection.settings_dict["NAME"] = database_name
+
+    def seed(self, rows, departments):
+        self.stdout.write(f"Seeding {rows} tasks over {departments} departments...")
+        department_ids = [
+            department.id
+            for department in Department.objects.bulk_create(
+                Department(department_name=f"Benchmark department {n}")
+                for n in range(departments)
+            )
+        ]
+        # TEMPLATE_DUE_DATE_TYPES templates per department, in department order
+        template_ids = [
+            template.id
+            for template in Template.objects.bulk_create(
+                Template(
+                    task_name=f"Benchmark {type_of_due_date} return",
+                    department_id=department_id,
+                    type_of_due_date=type_of_due_date,
+                    type_of_compliance="monthly",
+                    recurring_interval="monthly",
+                )
+                for department_id in department_ids
+                for type_of_due_date in TEMPLATE_DUE_DATE_TYPES
+            )
+        ]
+
+        # Mostly submitted history, with a realistic share of open work
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Task._meta.db_table} (
+                    task_name, due_date, board_meeting_date_flag, current_status,
+                    department_id, template_id, type_of_compliance, priority,
+                    uiic_contact, compliance_contact, circular_url,
+                    circular_details, return_number, created_on, updated_on
+                )
+                SELECT
+                    'Benchmark task ' || n,
+                    CASE WHEN n %% 40 = 0 THEN NULL
+                         ELSE %(today)s::date + (n %% 1460) - 1095 END,
+                    n %% 3 = 0,
+                    CASE WHEN n %% 20 < 14 THEN 'submitted'
+                         WHEN n %% 20 < 17 THEN 'pending'
+                         WHEN n %% 20 = 17 THEN 'to_be_approved'
+                         WHEN n %% 20 = 18 THEN 'review'
+                         ELSE 'revision' END,
+                    (%(departments)s::bigint[])[1 + n %% %(department_count)s],
+                    (%(templates)s::bigint[])[
+                        1 + (n %% %(department_count)s) * %(types)s
+                        + (n / %(department_count)s) %% %(types)s
+                    ],
+                    (ARRAY['daily', 'weekly', 'fortnightly', 'monthly',
+                           'quarterly', 'halfyearly', 'annual', 'adhoc',
+                           'public_disclosure'])[1 + n %% 9],
+                    1 + n %% 3,
+                    -- Contact and circular columns as wide as real ones
+                    'officer' || n %% 50 || '@example.com, desk' || n %% 7
+                        || '@example.com',
+                    'compliance' || n %% 5 || '@example.com',
+                    'https://www.example.gov.in/circulars/' || n / 12 || '.pdf',
+                    'Circular ' || n / 12 || ' on periodic returns',
+                    'RET/' || n %% 400,
+                    now(),
+                    now()
+                FROM generate_series(1, %(rows)s) AS n
+                -- In due date order, as populate_tasks adds them period by
+                -- period, so the indexes fill the way they do in production
+                ORDER BY n %% 1460, n
+                """,
+                {
+                    "today": localdate(),
+                    "departments": department_ids,
+                    "department_count": len(department_ids),
+                    "templates": template_ids,
+                    "types": len(TEMPLATE_DUE_DATE_TYPES),
+                    "rows": rows,
+                },
+            )
+
+        rebuild_task_summary(department_ids)
+        with connection.cursor() as cursor:
+            for model in (Department, Template, Task, TaskSummary):
+                cursor.execute(f"VACUUM ANALYZE {model._meta.db_table}")
+        return department_ids
+
+    def list_queryset(self, view_class, date_filter, recurrence, department_id):
+        base = Task.objects.select_related("department")
+        if department_id is not None:
+            base = base.filter(department_id=department_id)
+
+        # Run the view's own filter chain on top of the chosen scope
+        view = view_class()
+        view.kwargs = {"recurrence": recurrence}
+        view.date_filter = date_filter
+        view.base_queryset = lambda: base
+        return view.get_queryset()
+
+    def queries(self, department_id):
+        today = localdate()
+        for scope, scope_id in [("all", None), ("department", department_id)]:
+            for label, view_class, date_filter in LIST_VIEWS:
+                for recurrence in ["all", "monthly"]:
+                    qs = self.list_queryset(
+                        view_class, date_filter, recurrence, scope_id
+                    )
+                    name = f"{label}/{recurrence}/{scope}"
+                    yield f"{name} first page", qs.order_by(*keyset_ordering())[:26]
+                    yield (
+                        f"{name} next page",
+                        segment_after(qs, (today, 2, 1))[:26],
+                    )
+                    # Rows behind the count and the ETag fingerprint
+                    yield (
+                        f"{name} fingerprint",
+                        qs.order_by().values("id", "updated_on"),
+                    )
+
+        # The unscoped counters read the whole (small) summary table
+        yield (
+            "sidebar counters/department",
+            TaskSummary.objects.filter(department_id=department_id).values(
+                "current_status", "due_date", "awaiting_board_meeting", "task_count"
+            ),
+        )
+        # Before and after counts of a bulk change (compliance.summary)
+        task_ids = Task.objects.filter(department_id=department_id).values_list(
+            "id", flat=True
+        )[:100]
+        yield (
+            "summary deltas/100 tasks",
+            summary_rows(Task.objects.filter(id__in=list(task_ids))),
+        )
+
+    def check_plans(self, department_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)",
+                [list(BENCHMARK_TABLES)],
+            )
+            table_rows = dict(cursor.fetchall())
+
+        failures = []
+        for name, qs in self.queries(department_id):
+            scans = self.table_scans(json.loads(qs.explain(format="json"))[0]["Plan"])
+            ok = all(
+                node in REQUIRED_SCANS
+                or (node in BITMAP_SCANS and rows <= SMALL_RESULT_ROWS)
+                or (
+                    node == "Seq Scan"
+                    and rows >= LARGE_RESULT_SHARE * table_rows[table]
+                )
+                for node, _, table, rows in scans
+            )
+            if not ok:
+                failures.append(name)
+            summary = ", ".join(
+                f"{node} using {index}" if index else node
+                for node, index, _, _ in scans
+            )
+            self.stdout.write(f"{'ok  ' if ok else 'FAIL'} {name}: {summary}")
+        return failures
+
+    def table_scans(self, plan):
+        """
+        (node type, index name, table, estimated rows) of each scan of a
+        benchmarked table.
+        """
+        scans = []
+        if plan.get("Relation Name") in BENCHMARK_TABLES or (
+            plan["Node Type"] == "Bitmap Index Scan"
+        ):
+            scans.append(
+                (
+                    plan["Node Type"],
+                    plan.get("Index Name"),
+                    plan.get("Relation Name"),
+                    plan["Plan Rows"],
+                )
+            )
+        for child in plan.get("Plans", []):
+            scans += self.table_scans(child)
+        return scans
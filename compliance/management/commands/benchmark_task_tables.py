@@ -0,0 +1,95 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.html import conditional_escape
+
+from accounts.models import Department
+from compliance.models import Task
+from compliance.tables import TaskApprovalTable, TaskRowRenderer, TaskTable
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering the cells of a large in-memory task list through "
+        "django-tables2 and through TaskRowRenderer, and check both produce "
+        "the same output. No database rows are created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument(
+            "--min-speedup",
+            type=float,
+            default=0,
+            help="Fail unless the fast renderer is at least this many times faster",
+        )
+
+    def handle(self, *args, **options):
+        tasks = self.make_tasks(options["rows"])
+
+        slowest = None
+        for table_class in (TaskTable, TaskApprovalTable):
+            generic_time, generic = self.timed(self.render_generic, table_class, tasks)
+            fast_time, fast = self.timed(self.render_fast, table_class, tasks)
+            if generic != fast:
+                raise CommandError(
+                    f"{table_class.__name__}: fast renderer output differs"
+                )
+
+            speedup = generic_time / fast_time
+            slowest = speedup if slowest is None else min(slowest, speedup)
+            self.stdout.write(
+                f"{table_class.__name__}: {len(tasks)} rows, "
+                f"django-tables2 {generic_time * 1000:.0f} ms, "
+                f"TaskRowRenderer {fast_time * 1000:.0f} ms ({speedup:.1f}x)"
+            )
+
+        if slowest < options["min_speedup"]:
+            raise CommandError(
+                f"Speedup {slowest:.1f}x is below {options['min_speedup']}x"
+            )
+
+    def make_tasks(self, rows):
+        departments = [
+            Department(id=n, department_name=f"Department {n} & Co")
+            for n in range(1, 26)
+        ]
+        statuses = [
+            value for value, _ in Task._meta.get_field("current_status").choices
+        ]
+        types = [
+            value for value, _ in Task._meta.get_field("type_of_compliance").choices
+        ]
+        start = date(2026, 1, 1)
+        return [
+            Task(
+                id=n,
+                task_name=f"Return <{n}>",
+                department=departments[n % len(departments)],
+                type_of_compliance=types[n % len(types)],
+                current_status=statuses[n % len(statuses)],
+                priority=1 + n % 3,
+                due_date=None if n % 40 == 0 else start + timedelta(days=n % 365),
+                data_document=f"data_documents/return {n}.pdf" if n % 3 else "",
+                date_of_document_forwarded=(
+                    start + timedelta(days=n % 200) if n % 5 == 0 else None
+                ),
+            )
+            for n in range(1, rows + 1)
+        ]
+
+    def timed(self, render, table_class, tasks):
+        started = time.perf_counter()
+        cells = render(table_class, tasks)
+        return time.perf_counter() - started, cells
+
+    def render_generic(self, table_class, tasks):
+        table = table_class(tasks, order_by=())
+        return [
+            [conditional_escape(row.get_cell(column.name)) for column in table.columns]
+            for row in table.rows
+        ]
+
+    def render_fast(self, table_class, tasks):
+        return TaskRowRenderer(table_class).rows(tasks)
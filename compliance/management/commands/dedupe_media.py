@@ -0,0 +1,79 @@
+import os
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from compliance.storage import DeduplicatingFileSystemStorage, file_digest
+
+
+class Command(BaseCommand):
+    help = (
+        "Deduplicate the files already under MEDIA_ROOT in place: each distinct "
+        "content is kept once as a blob and every file with that content becomes "
+        "a hard link to it. File names, paths and URLs do not change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how much space deduplication would free",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Also remove blobs no file links to any more",
+        )
+
+    def handle(self, *args, **options):
+        storage = DeduplicatingFileSystemStorage()
+        if not os.path.isdir(storage.location):
+            self.stdout.write(f"{storage.location} does not exist.")
+            return
+
+        if options["dry_run"]:
+            self.report(storage)
+            return
+
+        scanned = freed = 0
+        for name in storage.stored_files():
+            freed += storage.deduplicate(name)
+            scanned += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deduplicated {scanned} files, freeing {filesizeformat(freed)}."
+            )
+        )
+
+        if options["prune"]:
+            removed = storage.prune_blobs()
+            self.stdout.write(f"Removed {removed} unreferenced blobs.")
+
+    def report(self, storage):
+        # Size of each distinct inode per content: every inode but the one
+        # kept as the blob would be freed
+        inodes = defaultdict(dict)
+        blobs = {}
+        scanned = 0
+        for name in storage.stored_files():
+            path = storage.path(name)
+            stat = os.stat(path)
+            digest = file_digest(path)
+            inodes[digest][stat.st_ino] = stat.st_size
+            blob = storage.blob_path(digest)
+            if os.path.exists(blob):
+                blobs[digest] = os.stat(blob).st_ino
+            scanned += 1
+
+        freed = 0
+        for digest, sizes in inodes.items():
+            kept = blobs.get(digest, next(iter(sizes)))
+            freed += sum(size for ino, size in sizes.items() if ino != kept)
+        self.stdout.write(
+            f"{scanned} files with {len(inodes)} distinct contents; "
+            f"deduplication would free {filesizeformat(freed)}."
+        )
+        unreferenced = storage.prune_blobs(dry_run=True)
+        if unreferenced:
+            self.stdout.write(f"{unreferenced} blobs are no longer referenced.")
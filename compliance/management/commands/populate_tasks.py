@@ -1,105 +1,250 @@
+from collections import defaultdict
 from datetime import datetime
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils.timezone import localdate
-from django.forms.models import model_to_dict
 
 from compliance.models import Template, Task
-from compliance.utils import calculate_due_date
+from compliance.signals import tasks_bulk_changed
+from compliance.summary import summary_counts, summary_deltas
+from compliance.utils import (
+    calculate_due_dates,
+    compliance_period_start,
+    compliance_period_starts,
+)
 
 
 class Command(BaseCommand):
     help = "Populate tasks from active recurring templates"
 
+    RECURRING_INTERVALS = [
+        "daily",
+        "weekly",
+        "fortnightly",
+        "monthly",
+        "quarterly",
+        "halfyearly",
+        "annual",
+    ]
+
+    # Template columns copied as-is onto every generated task
+    COPIED_FIELDS = [
+        "task_name",
+        "uiic_contact",
+        "compliance_contact",
+        "circular_url",
+        "circular_details",
+        "type_of_compliance",
+        "return_number",
+        "circular_document",
+        "data_document_template",
+        "priority",
+    ]
+
     def add_arguments(self, parser):
         parser.add_argument(
             "recurring_interval",
             type=str,
-            choices=[
-                "daily",
-                "weekly",
-                "fortnightly",
-                "monthly",
-                "quarterly",
-                "halfyearly",
-                "annual",
-            ],
-            help="Recurring interval for which tasks should be populated",
+            nargs="?",
+            choices=self.RECURRING_INTERVALS,
+            help=(
+                "Recurring interval for which tasks should be populated "
+                "(optional with --from/--to, where it defaults to all intervals)"
+            ),
         )
         parser.add_argument(
             "--run-date",
             type=str,
             help="Override today's date (format: DD/MM/YYYY)",
         )
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            type=str,
+            help="Backfill every occurrence from this date (format: DD/MM/YYYY)",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            type=str,
+            help="Backfill every occurrence up to this date (format: DD/MM/YYYY)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of tasks inserted per INSERT statement",
+        )
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, "%d/%m/%Y").date()
+        except ValueError:
+            raise CommandError(f"Invalid date {value!r}, expected DD/MM/YYYY")
 
     def handle(self, *args, **options):
         recurring_interval = options["recurring_interval"]
-        run_date = options.get("run_date")
-
-        def bulk_create(queryset):
-            periodical_tasks = []
-
-            for template in queryset:
-                task_data = model_to_dict(
-                    template,
-                    exclude=[
-                        "id",
-                        "repeat_month",
-                        "created_by",
-                        "updated_by",
-                        "due_date_days",
-                        "type_of_due_date",
-                        "alternate_due_date_days",
-                        "conditional_operator",
-                        "recurring_task_status",
-                        "recurring_interval",
-                        "department",
-                    ],
-                )
+        batch_size = options["batch_size"]
+
+        if options["from_date"] or options["to_date"]:
+            if not (options["from_date"] and options["to_date"]):
+                raise CommandError("--from and --to must be given together")
+            if options["run_date"]:
+                raise CommandError("--run-date cannot be combined with --from/--to")
+            self.backfill(
+                recurring_interval,
+                self.parse_date(options["from_date"]),
+                self.parse_date(options["to_date"]),
+                batch_size,
+            )
+            return
+
+        if not recurring_interval:
+            raise CommandError("recurring_interval is required without --from/--to")
+
+        if options["run_date"]:
+            today = self.parse_date(options["run_date"])
+        else:
+            today = localdate()
+
+        # Base recurring templates, plus annual templates due this month
+        # when running monthly
+        occurrences = self.template_occurrences(
+            recurring_interval, [today], annual_by_month=False
+        )
+        created, skipped = self.populate(occurrences, batch_size)
 
-                if template.type_of_due_date == "board_meeting":
-                    task_data["due_date"] = None
-                else:
-                    task_data["due_date"] = calculate_due_date(
-                        type_of_due_date=template.type_of_due_date,
-                        due_date_days=template.due_date_days,
-                        run_date=run_date,
-                    )
-                task_data["created_by_id"] = 1  # system user
-                task_data["department_id"] = template.department_id
-                task_data["current_status"] = "pending"
-                task_data["template"] = template
-
-                periodical_tasks.append(Task(**task_data))
-
-            Task.objects.bulk_create(periodical_tasks)
-
-        # Base recurring templates
-        periodical_templates = Template.objects.filter(
-            recurring_interval=recurring_interval,
-            recurring_task_status="Active",
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{recurring_interval.capitalize()} tasks populated successfully: "
+                f"{created} created, {skipped} skipped (already populated)."
+            )
         )
 
-        bulk_create(periodical_templates)
+    def backfill(self, recurring_interval, from_date, to_date, batch_size):
+        """
+        Populate every occurrence of each interval between the two dates,
+        running each interval on its period start dates.
+        """
+        if from_date > to_date:
+            raise CommandError("--from must not be after --to")
+
+        if recurring_interval:
+            intervals = [recurring_interval]
+        else:
+            # Annual templates come in through the monthly run
+            intervals = [i for i in self.RECURRING_INTERVALS if i != "annual"]
+
+        for interval in intervals:
+            run_dates = compliance_period_starts(interval, from_date, to_date)
+            occurrences = self.template_occurrences(
+                interval, run_dates, annual_by_month=True
+            )
+            created, skipped = self.populate(occurrences, batch_size)
 
-        # Include annual templates when running monthly
-        if recurring_interval == "monthly":
-            if run_date:
-                today = datetime.strptime(run_date, "%d/%m/%Y").date()
-            else:
-                today = localdate()
-            month_string = today.strftime("%B")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{interval.capitalize()}: {len(run_dates)} occurrence(s), "
+                    f"{created} created, {skipped} skipped (already populated)."
+                )
+            )
 
-            annual_templates = Template.objects.filter(
-                recurring_interval="annual",
-                repeat_month__month_name=month_string,
-                recurring_task_status="Active",
-            ).distinct()
+    def template_rows(self, templates, *extra_fields):
+        return templates.values(
+            "id",
+            "department_id",
+            "recurring_interval",
+            "due_date_days",
+            "type_of_due_date",
+            *self.COPIED_FIELDS,
+            *extra_fields,
+        )
 
-            bulk_create(annual_templates)
+    def template_occurrences(self, recurring_interval, run_dates, annual_by_month):
+        """
+        Pair every active template of `recurring_interval` with each run date.
+        Annual templates are paired with the run dates falling in one of
+        their repeat months, either as part of a monthly run or, with
+        `annual_by_month`, when backfilling the annual interval itself.
+        """
+        active = Template.objects.filter(recurring_task_status="Active")
+        occurrences = []
+
+        if not (annual_by_month and recurring_interval == "annual"):
+            rows = list(
+                self.template_rows(active.filter(recurring_interval=recurring_interval))
+            )
+            occurrences += [(row, run_date) for run_date in run_dates for row in rows]
+
+        if recurring_interval == "monthly" or (
+            annual_by_month and recurring_interval == "annual"
+        ):
+            annual_rows = defaultdict(list)
+            for row in self.template_rows(
+                active.filter(recurring_interval="annual"), "repeat_month__month_name"
+            ):
+                annual_rows[row["repeat_month__month_name"]].append(row)
+            occurrences += [
+                (row, run_date)
+                for run_date in run_dates
+                for row in annual_rows[run_date.strftime("%B")]
+            ]
+
+        return occurrences
+
+    def populate(self, occurrences, batch_size):
+        """
+        Insert one task per (template row, run date) occurrence in a single
+        transaction, computing every due date in one vectorised pass. Tasks
+        that already exist for their period are skipped by the
+        (template, period_start) unique constraint, so re-runs are safe.
+        Returns a (created, skipped) tuple.
+        """
+        if not occurrences:
+            return 0, 0
+
+        due_dates = calculate_due_dates(
+            start_dates=[run_date for _, run_date in occurrences],
+            due_date_days=[row["due_date_days"] for row, _ in occurrences],
+            types_of_due_date=[row["type_of_due_date"] for row, _ in occurrences],
+        )
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"{recurring_interval.capitalize()} tasks populated successfully."
+        periodical_tasks = [
+            Task(
+                **{field: row[field] for field in self.COPIED_FIELDS},
+                template_id=row["id"],
+                department_id=row["department_id"],
+                period_start=compliance_period_start(
+                    row["recurring_interval"], run_date
+                ),
+                run_date=run_date,
+                due_date=(
+                    None if row["type_of_due_date"] == "board_meeting" else due_date
+                ),
+                current_status="pending",
+                created_by_id=1,  # system user
             )
+            for (row, run_date), due_date in zip(occurrences, due_dates)
+        ]
+
+        existing = Task.objects.filter(
+            template_id__in={task.template_id for task in periodical_tasks},
+            period_start__in={task.period_start for task in periodical_tasks},
         )
+        with transaction.atomic():
+            before = summary_counts(existing)
+            Task.objects.bulk_create(
+                periodical_tasks, batch_size=batch_size, ignore_conflicts=True
+            )
+            deltas = summary_deltas(before, summary_counts(existing))
+        created = sum(deltas.values())
+
+        if created:
+            tasks_bulk_changed.send(
+                sender=Task,
+                department_ids={task.department_id for task in periodical_tasks},
+                summary_deltas=deltas,
+            )
+
+        return created, len(periodical_tasks) - created
@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, OperationalError, close_old_connections, connection
+from django.utils.timezone import localdate
+
+from compliance.models import TaskPopulationRun
+from compliance.utils import compliance_period_start, compliance_period_starts
+
+
+class Command(BaseCommand):
+    help = (
+        "Long-running scheduler that populates recurring tasks in-process "
+        "instead of relying on cron. Only one instance (the holder of a "
+        "Postgres advisory lock) does any work; others wait on standby."
+    )
+
+    # Annual templates are populated through the monthly run
+    RECURRING_INTERVALS = [
+        "daily",
+        "weekly",
+        "fortnightly",
+        "monthly",
+        "quarterly",
+        "halfyearly",
+    ]
+
+    # Arbitrary application-wide key for pg_try_advisory_lock
+    ADVISORY_LOCK_KEY = 0x636F6D70
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-seconds",
+            type=int,
+            default=300,
+            help="Seconds to sleep between scheduling passes",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single scheduling pass (with catch-up) and exit",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                # Replace a connection broken by a database restart; the
+                # advisory lock is then re-taken on the new one
+                close_old_connections()
+                try:
+                    if self.acquire_leadership():
+                        self.run_pending()
+                    elif options["once"]:
+                        self.stdout.write(
+                            "Another scheduler is running, nothing to do."
+                        )
+                except OperationalError as e:
+                    # The next pass retries on a fresh connection
+                    self.stderr.write(f"Scheduling pass failed: {e}")
+
+                if options["once"]:
+                    break
+                time.sleep(options["poll_seconds"])
+        finally:
+            self.release_leadership()
+
+    def acquire_leadership(self):
+        """
+        Try to take (or confirm) the session-level advisory lock. Called on
+        every pass so leadership is re-checked after a dropped connection.
+        """
+        if connection.vendor != "postgresql":
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.ADVISORY_LOCK_KEY])
+            return cursor.fetchone()[0]
+
+    def release_leadership(self):
+        if connection.vendor != "postgresql" or connection.connection is None:
+            return
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock_all()")
+        except OperationalError:
+            # The lock went with the broken connection
+            pass
+
+    def run_pending(self):
+        """
+        Populate every interval occurrence between its last successful run
+        and today, so runs missed while the scheduler was down are caught
+        up. An interval that has never run starts from its current period.
+        """
+        today = localdate()
+        last_runs = dict(
+            TaskPopulationRun.objects.values_list("recurring_interval", "last_run_date")
+        )
+
+        for interval in self.RECURRING_INTERVALS:
+            last_run_date = last_runs.get(interval)
+            if last_run_date is None:
+                from_date = compliance_period_start(interval, today)
+            else:
+                from_date = last_run_date + timedelta(days=1)
+
+            if from_date > today:
+                continue
+
+            if compliance_period_starts(interval, from_date, today):
+                try:
+                    call_command(
+                        "populate_tasks",
+                        interval,
+                        "--from",
+                        from_date.strftime("%d/%m/%Y"),
+                        "--to",
+                        today.strftime("%d/%m/%Y"),
+                        stdout=self.stdout,
+                    )
+                except (CommandError, DatabaseError) as e:
+                    # Leave last_run_date alone so the next pass retries
+                    self.stderr.write(f"Populating {interval} tasks failed: {e}")
+                    continue
+
+            TaskPopulationRun.objects.update_or_create(
+                recurring_interval=interval, defaults={"last_run_date": today}
+            )
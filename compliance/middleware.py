@@ -0,0 +1,15 @@
+from .audit import actor_context
+
+
+class AuditActorMiddleware:
+    """
+    Attributes compliance's own audit records made while handling a request
+    to its user, as AuditlogMiddleware does for auditlog's entries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with actor_context(request.user):
+            return self.get_response(request)
@@ -0,0 +1,71 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:21
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils.timezone import localdate
+
+
+def period_start(recurring_interval, run_date):
+    # Snapshot of compliance.utils.compliance_period_start
+    if recurring_interval == "daily":
+        return run_date
+    if recurring_interval == "weekly":
+        return run_date - timedelta(days=run_date.weekday())
+    if recurring_interval == "fortnightly":
+        return run_date.replace(day=1 if run_date.day < 16 else 16)
+    if recurring_interval in ("monthly", "annual"):
+        return run_date.replace(day=1)
+    if recurring_interval == "quarterly":
+        return run_date.replace(month=(run_date.month - 1) // 3 * 3 + 1, day=1)
+    if recurring_interval == "halfyearly":
+        return run_date.replace(month=1 if run_date.month < 7 else 7, day=1)
+    return None
+
+
+def backfill_period_start(apps, schema_editor):
+    """
+    Key the tasks populate_tasks already generated (created by the system
+    user) so a re-run for the current period is skipped. If a period was
+    populated twice, only the first copy is keyed.
+    """
+    Task = apps.get_model("compliance", "Task")
+
+    seen = set()
+    tasks = []
+    rows = (
+        Task.objects.filter(created_by_id=1, template__isnull=False)
+        .order_by("id")
+        .values_list("id", "template_id", "template__recurring_interval", "created_on")
+    )
+    for task_id, template_id, recurring_interval, created_on in rows:
+        key = (template_id, period_start(recurring_interval, localdate(created_on)))
+        if key[1] is None or key in seen:
+            continue
+        seen.add(key)
+        tasks.append(Task(id=task_id, period_start=key[1]))
+
+    Task.objects.bulk_update(tasks, ["period_start"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("compliance", "0009_alter_task_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="period_start",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                help_text=(
+                    "Start of the compliance period this recurring task was "
+                    "generated for"
+                ),
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_period_start, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("compliance", "0010_task_period_start"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="task",
+            constraint=models.UniqueConstraint(
+                fields=("template", "period_start"),
+                name="unique_task_per_template_period",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("compliance", "0011_task_unique_task_per_template_period"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskPopulationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "recurring_interval",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("fortnightly", "Fortnightly"),
+                            ("monthly", "Monthly"),
+                            ("quarterly", "Quarterly"),
+                            ("halfyearly", "Halfyearly"),
+                        ],
+                        max_length=100,
+                        unique=True,
+                    ),
+                ),
+                ("last_run_date", models.DateField()),
+                ("updated_on", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, Q, Value, When
+
+
+def populate_task_summary(apps, schema_editor):
+    # Snapshot of compliance.summary.rebuild_task_summary
+    Task = apps.get_model("compliance", "Task")
+    TaskSummary = apps.get_model("compliance", "TaskSummary")
+
+    rows = (
+        Task.objects.annotate(
+            awaiting_board_meeting=Case(
+                When(
+                    Q(
+                        current_status="pending",
+                        template__type_of_due_date__in=[
+                            "board_meeting",
+                            "board_meeting_conditional",
+                        ],
+                        board_meeting_date_flag=False,
+                    ),
+                    then=Value(True),
+                ),
+                default=Value(False),
+            )
+        )
+        .values(
+            "department_id",
+            "current_status",
+            "type_of_compliance",
+            "due_date",
+            "awaiting_board_meeting",
+        )
+        .annotate(task_count=Count("id"))
+        .order_by()
+    )
+    TaskSummary.objects.bulk_create(
+        [TaskSummary(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0006_alter_customuser_options_remove_customuser_user_type"),
+        ("compliance", "0012_taskpopulationrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("current_status", models.CharField(max_length=100)),
+                ("type_of_compliance", models.CharField(max_length=100)),
+                ("due_date", models.DateField(blank=True, null=True)),
+                (
+                    "awaiting_board_meeting",
+                    models.BooleanField(
+                        default=False,
+                        help_text=(
+                            "Pending board meeting date for a board meeting template"
+                        ),
+                    ),
+                ),
+                ("task_count", models.IntegerField(default=0)),
+                (
+                    "department",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accounts.department",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "task summaries",
+                "indexes": [
+                    models.Index(
+                        fields=["department", "current_status"],
+                        include=(
+                            "type_of_compliance",
+                            "due_date",
+                            "awaiting_board_meeting",
+                            "task_count",
+                        ),
+                        name="tasksummary_cover_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "department",
+                            "current_status",
+                            "type_of_compliance",
+                            "due_date",
+                            "awaiting_board_meeting",
+                        ),
+                        name="tasksummary_key_unique",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_task_summary, migrations.RunPython.noop),
+    ]
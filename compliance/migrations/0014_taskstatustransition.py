@@ -0,0 +1,109 @@
+# Generated by Django 6.0.2 on 2026-10-17 00:42
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_status_transitions(apps, schema_editor):
+    """Copy the current_status changes auditlog recorded so far."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    LogEntry = apps.get_model("auditlog", "LogEntry")
+    Task = apps.get_model("compliance", "Task")
+    TaskStatusTransition = apps.get_model("compliance", "TaskStatusTransition")
+
+    task_ct = ContentType.objects.filter(app_label="compliance", model="task").first()
+    if task_ct is None:
+        return
+
+    task_ids = set(Task.objects.values_list("id", flat=True))
+    logs = (
+        LogEntry.objects.filter(content_type=task_ct, changes__has_key="current_status")
+        .order_by("timestamp")
+        .values_list("object_pk", "changes", "actor_id", "timestamp")
+    )
+
+    transitions = []
+    for object_pk, changes, actor_id, timestamp in logs.iterator(chunk_size=2000):
+        if isinstance(changes, str):
+            changes = json.loads(changes)
+        try:
+            from_status, to_status = changes["current_status"]
+            task_id = int(object_pk)
+        except (TypeError, ValueError):
+            continue
+        if task_id not in task_ids:
+            continue
+        transitions.append(
+            TaskStatusTransition(
+                task_id=task_id,
+                from_status=None if from_status == "None" else from_status,
+                to_status=to_status,
+                actor_id=actor_id,
+                timestamp=timestamp,
+            )
+        )
+        if len(transitions) >= 2000:
+            TaskStatusTransition.objects.bulk_create(transitions)
+            transitions = []
+    TaskStatusTransition.objects.bulk_create(transitions)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auditlog", "0017_add_actor_email"),
+        ("compliance", "0013_tasksummary"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskStatusTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("to_status", models.CharField(max_length=100)),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_transitions",
+                        to="compliance.task",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["task", "timestamp"], name="task_status_transition_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_status_transitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("compliance", "0014_taskstatustransition"),
+    ]
+
+    # Existing tasks keep a NULL run date. Their due dates were counted from
+    # the day cron created them, which is what recompute_working_due_dates
+    # falls back to, not from their period start.
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="run_date",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                help_text="Date the task was generated for; its due date counts from it",
+                null=True,
+            ),
+        ),
+    ]
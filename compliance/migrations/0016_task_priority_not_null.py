@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+def default_missing_priorities(apps, schema_editor):
+    Task = apps.get_model("compliance", "Task")
+    Task.objects.filter(priority__isnull=True).update(priority=2)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("compliance", "0015_task_run_date"),
+    ]
+
+    operations = [
+        migrations.RunPython(default_missing_priorities, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="task",
+            name="priority",
+            field=models.IntegerField(
+                choices=[(3, "High"), (2, "Medium"), (1, "Low")], default=2
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-17 17:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY does not lock writes to compliance_task, but
+    # cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("compliance", "0016_task_priority_not_null"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["current_status", "due_date", "priority", "id"],
+                include=("updated_on", "template", "board_meeting_date_flag"),
+                name="task_status_due_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["department", "current_status", "due_date", "priority", "id"],
+                include=("updated_on", "template", "board_meeting_date_flag"),
+                name="task_dept_status_due_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=[
+                    "current_status",
+                    "type_of_compliance",
+                    "due_date",
+                    "priority",
+                    "id",
+                ],
+                include=("updated_on", "template", "board_meeting_date_flag"),
+                name="task_status_type_due_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=[
+                    "department",
+                    "current_status",
+                    "type_of_compliance",
+                    "due_date",
+                    "priority",
+                    "id",
+                ],
+                include=("updated_on", "template", "board_meeting_date_flag"),
+                name="task_dept_status_type_due_idx",
+            ),
+        ),
+    ]
@@ -9,6 +9,7 @@ from auditlog.registry import auditlog
 from accounts.models import Department
 
 from .mail_utils import parse_email_list
+from .permissions import permission_profile
 
 
 class Month(models.Model):
@@ -29,7 +30,40 @@ class PublicHoliday(models.Model):
         ordering = ["date_of_holiday"]
 
 
-class Template(models.Model):
+class LoadedValuesMixin:
+    """
+    Remembers each field's value as last loaded from or saved to the
+    database, in `_loaded_values`, so signal receivers can tell what a save
+    changed without reading the row back (compliance.summary).
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_loaded_values(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_loaded_values(kwargs.get("update_fields"))
+
+    def _remember_loaded_values(self, fields=None):
+        deferred = self.get_deferred_fields()
+        loaded_values = getattr(self, "_loaded_values", {})
+        loaded_values.update(
+            (field.attname, getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+            and (fields is None or {field.name, field.attname} & set(fields))
+        )
+        self._loaded_values = loaded_values
+
+
+class Template(LoadedValuesMixin, models.Model):
     task_name = models.CharField(max_length=100)
 
     due_date_days = models.PositiveIntegerField(
@@ -149,7 +183,7 @@ class Template(models.Model):
         return reverse("template_detail", kwargs={"pk": self.pk})
 
 
-class Task(models.Model):
+class Task(LoadedValuesMixin, models.Model):
     task_name = models.CharField(max_length=100)
     board_meeting_date = models.DateField(
         null=True,
@@ -229,8 +263,6 @@ class Task(models.Model):
         blank=True, null=True, upload_to="outbound_data_document/"
     )
     priority = models.IntegerField(
-        blank=True,
-        null=True,
         choices=((3, "High"), (2, "Medium"), (1, "Low")),
         default=2,
     )  # high/medium/low
@@ -276,6 +308,20 @@ class Task(models.Model):
         null=True,
         blank=True,
     )
+    period_start = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=(
+            "Start of the compliance period this recurring task was generated for"
+        ),
+    )
+    run_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Date the task was generated for; its due date counts from it",
+    )
 
     def __str__(self):
         return self.task_name
@@ -288,73 +334,56 @@ class Task(models.Model):
 
     def can_request_revision(self, user) -> bool:
         """
-        Can the given user request a revision for this task?
+        Can the given user (or permission profile) request a revision for
+        this task?
         """
-        if not user or not user.is_authenticated:
-            return False
-
+        profile = permission_profile(user)
         return (
-            user.has_perm("compliance.can_edit_as_compliance")
+            profile.edit_as_compliance
             and self.current_status in self.REVIEWABLE_STATUSES
         )
 
     def can_mark_as_pending(self, user) -> bool:
         """
-        Can the given user mark this task as pending?
+        Can the given user (or permission profile) mark this task as pending?
         """
-
-        if not user or not user.is_authenticated:
-            return False
-
-        return (
-            user.has_perm("compliance.can_mark_as_pending")
-            and self.current_status == "to_be_approved"
-        )
+        profile = permission_profile(user)
+        return profile.mark_as_pending and self.current_status == "to_be_approved"
 
     def can_view(self, user) -> bool:
-        if not user or not user.is_authenticated:
-            return False
-        if user.has_perm("compliance.can_view_as_compliance"):
+        profile = permission_profile(user)
+        if profile.view_as_compliance or profile.edit_as_compliance:
             return True
 
-        if user.has_perm("compliance.can_edit_as_compliance"):
-            return True
-        if (
-            user.has_perm("compliance.can_edit_as_department")
-            and self.department_id == user.department_id
-        ):
-            return True
-
-        return False
+        return (
+            profile.edit_as_department and self.department_id == profile.department_id
+        )
 
     def can_edit(self, user) -> bool:
         """
-        Can the given user edit this task?
+        Can the given user (or permission profile) edit this task?
         """
-        if not user or not user.is_authenticated:
-            return False
+        profile = permission_profile(user)
 
         if (
-            user.has_perm("compliance.can_edit_as_department")
+            profile.edit_as_department
             and self.current_status in self.EDITABLE_STATUSES
-            and self.department_id == user.department_id
+            and self.department_id == profile.department_id
         ):
             return True
 
-        if (
-            user.has_perm("compliance.can_edit_as_compliance")
-            and self.current_status != "submitted"
-        ):
+        if profile.edit_as_compliance and self.current_status != "submitted":
             return True
 
         return False
 
     def permission_context(self, user):
+        profile = permission_profile(user)
         return {
-            "can_view": self.can_view(user),
-            "can_edit": self.can_edit(user),
-            "can_request_revision": self.can_request_revision(user),
-            "can_mark_as_pending": self.can_mark_as_pending(user),
+            "can_view": self.can_view(profile),
+            "can_edit": self.can_edit(profile),
+            "can_request_revision": self.can_request_revision(profile),
+            "can_mark_as_pending": self.can_mark_as_pending(profile),
         }
 
     def uiic_emails(self) -> list[str]:
@@ -373,6 +402,128 @@ class Task(models.Model):
             ("can_edit_as_compliance", "Can edit task as compliance user"),
             ("can_view_as_compliance", "Can view task as compliance user"),
         ]
+        constraints = [
+            # One generated task per template per compliance period
+            models.UniqueConstraint(
+                fields=["template", "period_start"],
+                name="unique_task_per_template_period",
+            ),
+        ]
+        indexes = [
+            # Task lists, optionally scoped to a department and a recurrence,
+            # walked in keyset order (compliance.pagination). The included
+            # columns answer the lists' ETag fingerprint (count and latest
+            # change) from the index alone, the board meeting list's too.
+            models.Index(
+                fields=["current_status", "due_date", "priority", "id"],
+                include=["updated_on", "template", "board_meeting_date_flag"],
+                name="task_status_due_idx",
+            ),
+            models.Index(
+                fields=["department", "current_status", "due_date", "priority", "id"],
+                include=["updated_on", "template", "board_meeting_date_flag"],
+                name="task_dept_status_due_idx",
+            ),
+            models.Index(
+                fields=[
+                    "current_status",
+                    "type_of_compliance",
+                    "due_date",
+                    "priority",
+                    "id",
+                ],
+                include=["updated_on", "template", "board_meeting_date_flag"],
+                name="task_status_type_due_idx",
+            ),
+            models.Index(
+                fields=[
+                    "department",
+                    "current_status",
+                    "type_of_compliance",
+                    "due_date",
+                    "priority",
+                    "id",
+                ],
+                include=["updated_on", "template", "board_meeting_date_flag"],
+                name="task_dept_status_type_due_idx",
+            ),
+        ]
+
+
+class TaskPopulationRun(models.Model):
+    """Last date run_scheduler successfully populated each interval up to."""
+
+    recurring_interval = models.CharField(
+        max_length=100,
+        unique=True,
+        choices=(
+            ("daily", "Daily"),
+            ("weekly", "Weekly"),
+            ("fortnightly", "Fortnightly"),
+            ("monthly", "Monthly"),
+            ("quarterly", "Quarterly"),
+            ("halfyearly", "Halfyearly"),
+        ),
+    )
+    last_run_date = models.DateField()
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.recurring_interval} populated up to {self.last_run_date}"
+
+
+class TaskSummary(models.Model):
+    """
+    Number of tasks per department, status, type of compliance, due date and
+    board meeting state. Kept in sync by compliance.summary; due buckets
+    (overdue, due today, upcoming) are derived from due_date when read.
+    """
+
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    current_status = models.CharField(max_length=100)
+    type_of_compliance = models.CharField(max_length=100)
+    due_date = models.DateField(null=True, blank=True)
+    awaiting_board_meeting = models.BooleanField(
+        default=False,
+        help_text="Pending board meeting date for a board meeting template",
+    )
+    task_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "task summaries"
+        indexes = [
+            # Covers the sidebar counter aggregate
+            models.Index(
+                fields=["department", "current_status"],
+                include=[
+                    "type_of_compliance",
+                    "due_date",
+                    "awaiting_board_meeting",
+                    "task_count",
+                ],
+                name="tasksummary_cover_idx",
+            ),
+        ]
+        # One row per summary key, rows without a due date included
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "department",
+                    "current_status",
+                    "type_of_compliance",
+                    "due_date",
+                    "awaiting_board_meeting",
+                ],
+                nulls_distinct=False,
+                name="tasksummary_key_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.department} / {self.current_status} / "
+            f"{self.type_of_compliance} / {self.due_date}: {self.task_count}"
+        )
 
 
 class TaskRemark(models.Model):
@@ -393,6 +544,30 @@ class TaskRemark(models.Model):
         return f"Remark for {self.task.task_name} at {self.created_at}"
 
 
+class TaskStatusTransition(models.Model):
+    """One change of Task.current_status, for the status history panel."""
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="status_transitions"
+    )
+    from_status = models.CharField(max_length=100, null=True, blank=True)
+    to_status = models.CharField(max_length=100)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["task", "timestamp"], name="task_status_transition_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.from_status} → {self.to_status}"
+
+
 class RegulatoryPublication(models.Model):
     CATEGORY_CHOICES = {
         "REGULATIONS": "Regulations",
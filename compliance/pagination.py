@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.db.models import F, Field, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+
+# Task lists are paged on this unique key instead of an offset, so a page
+# deep into the list costs the same as the first one. Backed by the
+# task_*status*_due_idx indexes, which end in these columns. Tasks without
+# a due date sort last, as in Postgres; priority and id are never null.
+KEYSET_FIELDS = ("due_date", "priority", "id")
+
+
+def keyset_ordering(reverse=False):
+    if reverse:
+        return [F(field).desc(nulls_first=True) for field in KEYSET_FIELDS]
+    return [F(field).asc(nulls_last=True) for field in KEYSET_FIELDS]
+
+
+def encode_cursor(task):
+    due_date, priority, pk = (getattr(task, field) for field in KEYSET_FIELDS)
+    payload = json.dumps([due_date and due_date.isoformat(), priority, pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Key values of an opaque cursor, or None if it is missing or invalid."""
+    if not cursor:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        due_date, priority, pk = json.loads(payload)
+        return (
+            date.fromisoformat(due_date) if due_date is not None else None,
+            int(priority),
+            int(pk),
+        )
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
+
+class RowValue(Func):
+    """A row value such as (due_date, priority, id), for row comparisons."""
+
+    function = ""
+    output_field = Field()
+
+
+def _key_row(fields):
+    return RowValue(*(F(field) for field in fields))
+
+
+def _value_row(values):
+    return RowValue(*(Value(value) for value in values))
+
+
+def segment_after(qs, key):
+    """
+    Rows of `qs` past the key values of a cursor, in keyset order, within
+    the cursor's own segment: the tasks with a due date or the ones
+    without, which sort after them.
+
+    Rows with a due date are compared as one row value, (due_date,
+    priority, id) > (%s, %s, %s), which the database answers with a range
+    scan of the keyset index. The comparison is never true for a null due
+    date, so it selects the dated segment on its own.
+    """
+    due_date, priority, pk = key
+    if due_date is None:
+        qs = qs.filter(
+            GreaterThan(_key_row(KEYSET_FIELDS[1:]), _value_row((priority, pk))),
+            due_date__isnull=True,
+        )
+    else:
+        qs = qs.filter(GreaterThan(_key_row(KEYSET_FIELDS), _value_row(key)))
+    return qs.order_by(*keyset_ordering())
+
+
+def segment_before(qs, key):
+    """segment_after() in the other direction, in reverse keyset order."""
+    due_date, priority, pk = key
+    if due_date is None:
+        qs = qs.filter(
+            LessThan(_key_row(KEYSET_FIELDS[1:]), _value_row((priority, pk))),
+            due_date__isnull=True,
+        )
+    else:
+        qs = qs.filter(LessThan(_key_row(KEYSET_FIELDS), _value_row(key)))
+    return qs.order_by(*keyset_ordering(reverse=True))
+
+
+def rows_after(qs, key, limit):
+    """Up to `limit` rows of `qs` past a cursor's key, in keyset order."""
+    rows = list(segment_after(qs, key)[:limit])
+    if len(rows) < limit and key[0] is not None:
+        # Continue into the tasks without a due date
+        undated = qs.filter(due_date__isnull=True).order_by(*keyset_ordering())
+        rows += undated[: limit - len(rows)]
+    return rows
+
+
+def rows_before(qs, key, limit):
+    """Up to `limit` rows of `qs` before a cursor's key, in reverse order."""
+    rows = list(segment_before(qs, key)[:limit])
+    if len(rows) < limit and key[0] is None:
+        # Continue back into the tasks with a due date
+        dated = qs.filter(due_date__isnull=False)
+        rows += dated.order_by(*keyset_ordering(reverse=True))[: limit - len(rows)]
+    return rows
+
+
+def keyset_page(qs, length, after=None, before=None, offset=0):
+    """
+    One page of `qs` in keyset order, as (rows, next_cursor, prev_cursor).
+
+    `after` / `before` are cursors from a previous page; without them the
+    page starts at `offset`, which is only cheap for the first pages.
+    """
+    after_key = decode_cursor(after)
+    before_key = decode_cursor(before)
+
+    if after_key is not None:
+        rows = rows_after(qs, after_key, length + 1)
+        has_next, has_prev = len(rows) > length, True
+        rows = rows[:length]
+    elif before_key is not None:
+        rows = rows_before(qs, before_key, length + 1)
+        has_next, has_prev = True, len(rows) > length
+        rows = rows[:length][::-1]
+    else:
+        rows = list(qs.order_by(*keyset_ordering())[offset : offset + length + 1])
+        has_next, has_prev = len(rows) > length, offset > 0
+        rows = rows[:length]
+
+    next_cursor = encode_cursor(rows[-1]) if rows and has_next else None
+    prev_cursor = encode_cursor(rows[0]) if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,105 @@
+import uuid
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import transaction
+
+PERMISSIONS_VERSION_KEY = "compliance:permissions:version"
+PERMISSION_PROFILE_TIMEOUT = 60 * 60 * 24
+
+# Profile flag -> permission it stands for
+ROLE_PERMISSIONS = {
+    "view_as_compliance": "compliance.can_view_as_compliance",
+    "edit_as_compliance": "compliance.can_edit_as_compliance",
+    "edit_as_department": "compliance.can_edit_as_department",
+    "mark_as_pending": "compliance.can_mark_as_pending",
+}
+
+
+@dataclass(frozen=True)
+class PermissionProfile:
+    """
+    The task roles of one user, resolved once instead of through repeated
+    `has_perm` calls. Task permission helpers accept it in place of a user.
+    """
+
+    user_id: int | None = None
+    department_id: int | None = None
+    is_authenticated: bool = False
+    is_superuser: bool = False
+    view_as_compliance: bool = False
+    edit_as_compliance: bool = False
+    edit_as_department: bool = False
+    mark_as_pending: bool = False
+
+    @property
+    def department_scoped(self):
+        """Department users only ever see their own department's tasks."""
+        return self.edit_as_department and not self.is_superuser
+
+
+ANONYMOUS_PROFILE = PermissionProfile()
+
+
+def permissions_version():
+    return cache.get_or_set(
+        PERMISSIONS_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None
+    )
+
+
+def invalidate_permission_profiles():
+    """
+    Called whenever group membership or permission assignments change. The
+    version is bumped once the transaction commits, so a request reading the
+    old assignments in between cannot cache them under the new version.
+    """
+    transaction.on_commit(
+        lambda: cache.set(PERMISSIONS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    )
+
+
+def compile_permission_profile(user):
+    perms = user.get_all_permissions() if user.is_active else set()
+    return PermissionProfile(
+        user_id=user.pk,
+        department_id=user.department_id,
+        is_authenticated=True,
+        is_superuser=user.is_superuser,
+        **{
+            flag: user.is_active and (user.is_superuser or perm in perms)
+            for flag, perm in ROLE_PERMISSIONS.items()
+        },
+    )
+
+
+def permission_profile(user):
+    """
+    The PermissionProfile of `user` (which may already be a profile).
+
+    Kept on the user object for the rest of the request and in the cache
+    across requests. The cache key carries the permissions version and the
+    user's own role-relevant fields, so a change to either misses.
+    """
+    if isinstance(user, PermissionProfile):
+        return user
+    if not user or not user.is_authenticated:
+        return ANONYMOUS_PROFILE
+
+    profile = getattr(user, "_permission_profile", None)
+    if profile is not None:
+        return profile
+
+    key = "compliance:permissions:{}:{}:{}:{}:{}".format(
+        permissions_version(),
+        user.pk,
+        user.department_id,
+        int(user.is_superuser),
+        int(user.is_active),
+    )
+    profile = cache.get(key)
+    if profile is None:
+        profile = compile_permission_profile(user)
+        cache.set(key, profile, PERMISSION_PROFILE_TIMEOUT)
+
+    user._permission_profile = profile
+    return profile
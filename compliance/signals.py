@@ -0,0 +1,188 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from accounts.models import Department
+
+from .audit import record_status_transitions
+from .counters import invalidate_task_counts
+from .models import PublicHoliday, Task, Template
+from .permissions import invalidate_permission_profiles
+from .summary import (
+    BOARD_MEETING_DUE_DATE_TYPES,
+    apply_summary_deltas,
+    due_date_type_change_deltas,
+    move_task_summary,
+    previous_task_state,
+    rebuild_task_summary,
+    saved_task_summary_key,
+    state_summary_key,
+)
+from .utils import holiday_calendar, recompute_working_due_dates
+
+# Sent after tasks are changed in bulk (bulk_create, bulk_update, update),
+# which bypasses the model signals. Takes a `department_ids` argument and
+# optionally `summary_deltas` (see compliance.summary.summary_deltas);
+# without it the summary of those departments is recounted.
+tasks_bulk_changed = Signal()
+
+# Per thread, like database connections: the due date recompute queued by
+# the open transaction's holiday changes
+_queued_recompute = threading.local()
+
+
+def recompute_working_due_dates_on_commit(changed_dates):
+    """
+    Add `changed_dates` to the recompute_working_due_dates pass run once the
+    transaction commits, so a transaction changing many holidays (a bulk
+    delete or an import) recomputes and audits them all in one pass.
+    """
+    queued = getattr(_queued_recompute, "callback", None)
+    # A rolled back transaction or savepoint drops the callback unrun
+    if queued is not None and any(
+        func is queued for _, func, _ in transaction.get_connection().run_on_commit
+    ):
+        _queued_recompute.dates.update(changed_dates)
+        return
+
+    dates = _queued_recompute.dates = set(changed_dates)
+
+    def recompute():
+        _queued_recompute.callback = None
+        recompute_working_due_dates(dates)
+
+    _queued_recompute.callback = recompute
+    transaction.on_commit(recompute)
+
+
+@receiver(pre_save, sender=PublicHoliday)
+def remember_previous_holiday_date(sender, instance, **kwargs):
+    # An edit that moves a holiday affects both its old and its new date
+    instance._previous_date = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("date_of_holiday", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver([post_save, post_delete], sender=PublicHoliday)
+def holiday_calendar_changed(sender, instance, **kwargs):
+    holiday_calendar.invalidate()
+
+    changed_dates = {
+        instance.date_of_holiday,
+        getattr(instance, "_previous_date", None),
+    }
+    changed_dates.discard(None)
+    if changed_dates:
+        recompute_working_due_dates_on_commit(changed_dates)
+
+
+@receiver([pre_save, pre_delete], sender=Task)
+def remember_previous_task_state(sender, instance, **kwargs):
+    instance._previous_state = previous_task_state(instance)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, **kwargs):
+    previous_state = getattr(instance, "_previous_state", None)
+    old_key = None if previous_state is None else state_summary_key(previous_state)
+    new_key = (
+        None
+        if kwargs["signal"] is post_delete
+        else saved_task_summary_key(
+            instance, previous_state, kwargs.get("update_fields")
+        )
+    )
+    move_task_summary(old_key, new_key)
+
+    # Moving a task to another department changes both departments' counters
+    invalidate_task_counts({key[0] for key in (old_key, new_key) if key})
+
+
+@receiver(post_save, sender=Template)
+def template_changed(sender, instance, created, update_fields, **kwargs):
+    # Whether the template is a board meeting one decides if its pending
+    # tasks are counted as waiting for a board meeting date
+    if created or (
+        update_fields is not None and "type_of_due_date" not in update_fields
+    ):
+        return
+    loaded = getattr(instance, "_loaded_values", {})
+    if "type_of_due_date" not in loaded:
+        # Saved without having been loaded: recount the affected departments
+        tasks_bulk_changed.send(
+            sender=Task,
+            department_ids=set(
+                Task.objects.filter(template=instance).values_list(
+                    "department_id", flat=True
+                )
+            ),
+        )
+        return
+    if (loaded["type_of_due_date"] in BOARD_MEETING_DUE_DATE_TYPES) == (
+        instance.type_of_due_date in BOARD_MEETING_DUE_DATE_TYPES
+    ):
+        return
+    deltas = due_date_type_change_deltas(instance)
+    if deltas:
+        tasks_bulk_changed.send(
+            sender=Task,
+            department_ids={key[0] for key in deltas},
+            summary_deltas=deltas,
+        )
+
+
+@receiver(post_save, sender=Department)
+def department_changed(sender, instance, created, **kwargs):
+    # A rename shows up in the department column of every cached task list
+    if not created:
+        invalidate_task_counts({instance.pk})
+
+
+@receiver(post_save, sender=Task)
+def record_status_change(sender, instance, created, **kwargs):
+    previous_state = getattr(instance, "_previous_state", None)
+    from_status = None if previous_state is None else previous_state["current_status"]
+    if created or from_status != instance.current_status:
+        record_status_transitions({instance.pk: from_status}, instance.current_status)
+
+
+@receiver(tasks_bulk_changed)
+def tasks_changed_in_bulk(sender, department_ids, summary_deltas=None, **kwargs):
+    if summary_deltas is None:
+        rebuild_task_summary(department_ids)
+    else:
+        apply_summary_deltas(summary_deltas)
+    invalidate_task_counts(set(department_ids))
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+@receiver(m2m_changed, sender=get_user_model().user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permissions_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_permission_profiles()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver([post_save, post_delete], sender=get_user_model())
+def permission_holder_changed(sender, **kwargs):
+    # A saved user only matters when new: profiles of existing users are
+    # keyed on the fields a save can change
+    if kwargs["signal"] is post_save and not kwargs["created"]:
+        return
+    invalidate_permission_profiles()
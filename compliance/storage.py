@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+BLOB_DIR = ".blobs"
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(path):
+    """SHA-256 of the file at `path`, read in chunks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DeduplicatingFileSystemStorage(FileSystemStorage):
+    """
+    FileSystemStorage that keeps each distinct file content once.
+
+    Uploads are hashed (SHA-256) while they are streamed to disk. The
+    content is stored once as a blob under MEDIA_ROOT/.blobs/ named by its
+    digest, and every file name saved with that content is a hard link to
+    the blob. Names, paths and URLs therefore behave exactly as before,
+    while the link count of the blob is its reference count: a blob is
+    removed together with the last name pointing at it.
+    """
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest[2:4], digest)
+
+    def references(self, name):
+        """How many file names share the content of `name`."""
+        return os.stat(self.path(name)).st_nlink - 1
+
+    def _save(self, name, content):
+        blob_root = os.path.join(self.location, BLOB_DIR)
+        os.makedirs(blob_root, exist_ok=True)
+
+        # Hash while writing to a temporary file next to the blobs, so the
+        # upload is read once and the file can be linked into place
+        sha = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=blob_root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    sha.update(chunk)
+                    tmp.write(chunk)
+            # mkstemp() creates the file private to this process
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            blob = self.blob_path(sha.hexdigest())
+            self._store_blob(tmp_path, blob)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        while True:
+            try:
+                os.link(blob, self.path(name))
+                break
+            except FileExistsError:
+                # Taken since get_available_name() was called
+                name = self.get_available_name(name)
+
+        # Store filenames with forward slashes, even on Windows
+        return str(name).replace("\\", "/")
+
+    def _store_blob(self, source, blob):
+        """Link `source` in as `blob`, unless that content is already stored."""
+        if os.path.exists(blob):
+            return
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        try:
+            os.link(source, blob)
+        except FileExistsError:
+            # Stored concurrently by another upload of the same content
+            pass
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        blob = None
+        if stat.st_nlink == 2:
+            # The last name of its content: the blob goes with it
+            blob = self.blob_path(file_digest(path))
+        super().delete(name)
+        if blob and os.path.exists(blob) and os.stat(blob).st_ino == stat.st_ino:
+            os.remove(blob)
+
+    def deduplicate(self, name):
+        """
+        Turn the existing file `name` into a link to the blob of its content.
+        Returns the number of bytes freed (0 if it was already stored once).
+        """
+        path = self.path(name)
+        stat = os.stat(path)
+        blob = self.blob_path(file_digest(path))
+
+        if not os.path.exists(blob):
+            self._store_blob(path, blob)
+            return 0
+        blob_stat = os.stat(blob)
+        if blob_stat.st_ino == stat.st_ino:
+            return 0
+
+        # Swapped in atomically, so the name never goes missing
+        tmp_path = f"{path}.dedup-{os.getpid()}"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.link(blob, tmp_path)
+        os.replace(tmp_path, path)
+        return stat.st_size if stat.st_nlink == 1 else 0
+
+    def stored_files(self):
+        """Names of every file under the storage root, blobs excluded."""
+        for root, dirs, files in os.walk(self.location):
+            if root == self.location and BLOB_DIR in dirs:
+                dirs.remove(BLOB_DIR)
+            for filename in files:
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, self.location).replace("\\", "/")
+
+    def prune_blobs(self, dry_run=False):
+        """Remove blobs no file name links to any more. Returns their count."""
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.location, BLOB_DIR)):
+            for filename in files:
+                path = os.path.join(root, filename)
+                if filename.startswith(".upload-") or os.stat(path).st_nlink > 1:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                removed += 1
+        return removed
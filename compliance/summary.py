@@ -0,0 +1,244 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from .models import Task, TaskSummary, Template
+
+BOARD_MEETING_DUE_DATE_TYPES = ["board_meeting", "board_meeting_conditional"]
+
+SUMMARY_FIELDS = [
+    "department_id",
+    "current_status",
+    "type_of_compliance",
+    "due_date",
+    "awaiting_board_meeting",
+]
+
+
+def awaiting_board_meeting(current_status, type_of_due_date, board_meeting_date_flag):
+    return (
+        current_status == "pending"
+        and type_of_due_date in BOARD_MEETING_DUE_DATE_TYPES
+        and not board_meeting_date_flag
+    )
+
+
+# Task fields a summary key is derived from, with the template's type of due date
+TASK_STATE_FIELDS = [
+    "department_id",
+    "current_status",
+    "type_of_compliance",
+    "due_date",
+    "board_meeting_date_flag",
+    "template_id",
+]
+
+
+def stored_task_state(task_id):
+    """Summary-relevant fields of a task as currently saved, or None."""
+    return (
+        Task.objects.filter(pk=task_id)
+        .values(*TASK_STATE_FIELDS, "template__type_of_due_date")
+        .first()
+    )
+
+
+def waits_for_template_type(state):
+    """Whether the template's type of due date can matter to the key."""
+    return (
+        state["template_id"] is not None
+        and state["current_status"] == "pending"
+        and not state["board_meeting_date_flag"]
+    )
+
+
+def template_due_date_type(task, template_id):
+    """Type of due date of template `template_id`, from `task` if loaded."""
+    if Task.template.is_cached(task) and task.template.pk == template_id:
+        return task.template.type_of_due_date
+    return (
+        Template.objects.filter(pk=template_id)
+        .values_list("type_of_due_date", flat=True)
+        .first()
+    )
+
+
+def previous_task_state(task):
+    """
+    Summary-relevant fields of `task` as last loaded or saved (see
+    LoadedValuesMixin), or as read from the database when the instance was
+    not loaded with all of them. The template's type of due date is only
+    looked up when it can matter to the key.
+    """
+    if not task.pk:
+        return None
+    loaded = getattr(task, "_loaded_values", {})
+    if not all(field in loaded for field in TASK_STATE_FIELDS):
+        return stored_task_state(task.pk)
+
+    state = {field: loaded[field] for field in TASK_STATE_FIELDS}
+    if waits_for_template_type(state):
+        state["template__type_of_due_date"] = template_due_date_type(
+            task, state["template_id"]
+        )
+    return state
+
+
+def state_summary_key(state):
+    """Summary key of a task state returned by previous_task_state()."""
+    return (
+        state["department_id"],
+        state["current_status"],
+        state["type_of_compliance"],
+        state["due_date"],
+        awaiting_board_meeting(
+            state["current_status"],
+            state.get("template__type_of_due_date"),
+            state["board_meeting_date_flag"],
+        ),
+    )
+
+
+def saved_task_summary_key(task, previous_state, update_fields=None):
+    """
+    Summary key of `task` right after save(), worked out from the instance
+    instead of being read back. Fields a save(update_fields=...) left alone
+    keep their `previous_state` value, and the template's type of due date
+    is only fetched when it matters and is not already known.
+    """
+    state = {field: getattr(task, field) for field in TASK_STATE_FIELDS}
+    if previous_state is not None and update_fields is not None:
+        saved = {Task._meta.get_field(name).attname for name in update_fields}
+        state = {
+            field: state[field] if field in saved else previous_state[field]
+            for field in TASK_STATE_FIELDS
+        }
+
+    if not waits_for_template_type(state):
+        return state_summary_key(state)
+    if (
+        previous_state is not None
+        and state["template_id"] == previous_state["template_id"]
+        and "template__type_of_due_date" in previous_state
+    ):
+        type_of_due_date = previous_state["template__type_of_due_date"]
+    else:
+        type_of_due_date = template_due_date_type(task, state["template_id"])
+    state["template__type_of_due_date"] = type_of_due_date
+    return state_summary_key(state)
+
+
+def adjust_task_summary(key, delta):
+    """
+    Add `delta` tasks to the summary row for `key`, creating it if needed
+    and deleting it once no task is left in it. The row is updated in place
+    (task_count = task_count + delta); when it does not exist yet it is
+    inserted, and an insert that loses a race with another one (the rows
+    are unique per key) falls back to the update.
+    """
+    lookup = dict(zip(SUMMARY_FIELDS, key))
+    rows = TaskSummary.objects.filter(**lookup)
+    if delta < 0:
+        # A row whose count would reach zero is removed instead
+        if not rows.filter(task_count__lte=-delta).delete()[0]:
+            rows.update(task_count=F("task_count") + delta)
+        return
+    if rows.update(task_count=F("task_count") + delta) or delta == 0:
+        return
+    try:
+        with transaction.atomic():
+            TaskSummary.objects.create(**lookup, task_count=delta)
+    except IntegrityError:
+        rows.update(task_count=F("task_count") + delta)
+
+
+def move_task_summary(old_key, new_key):
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        adjust_task_summary(old_key, -1)
+    if new_key is not None:
+        adjust_task_summary(new_key, 1)
+
+
+def summary_rows(tasks):
+    """Task counts of `tasks` per summary key, as one aggregate query."""
+    return (
+        tasks.annotate(
+            awaiting_board_meeting=Case(
+                When(
+                    Q(
+                        current_status="pending",
+                        template__type_of_due_date__in=BOARD_MEETING_DUE_DATE_TYPES,
+                        board_meeting_date_flag=False,
+                    ),
+                    then=Value(True),
+                ),
+                default=Value(False),
+            )
+        )
+        .values(*SUMMARY_FIELDS)
+        .annotate(task_count=Count("id"))
+        .order_by()
+    )
+
+
+def summary_counts(tasks):
+    """Counter of summary key to the number of `tasks` counted in it."""
+    return Counter(
+        {
+            tuple(row[field] for field in SUMMARY_FIELDS): row["task_count"]
+            for row in summary_rows(tasks)
+        }
+    )
+
+
+def summary_deltas(before, after):
+    """Change in task count per summary key between two summary_counts()."""
+    deltas = Counter(after)
+    deltas.subtract(before)
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def apply_summary_deltas(deltas):
+    """Apply a summary_deltas() mapping to the summary table."""
+    for key, delta in deltas.items():
+        adjust_task_summary(key, delta)
+
+
+def due_date_type_change_deltas(template):
+    """
+    Summary deltas of `template` having switched between a board meeting
+    type of due date and another: its pending tasks without a board
+    meeting date move to the other awaiting_board_meeting key.
+    """
+    after = summary_counts(
+        Task.objects.filter(
+            template=template, current_status="pending", board_meeting_date_flag=False
+        )
+    )
+    before = Counter({(*key[:-1], not key[-1]): count for key, count in after.items()})
+    return summary_deltas(before, after)
+
+
+def rebuild_task_summary(department_ids=None):
+    """
+    Recount the summary from compliance_task, for `department_ids` only or
+    for every department. Used after bulk writes and for reconciliation.
+    Returns the number of summary rows written.
+    """
+    tasks = Task.objects.all()
+    summaries = TaskSummary.objects.all()
+    if department_ids is not None:
+        tasks = tasks.filter(department_id__in=department_ids)
+        summaries = summaries.filter(department_id__in=department_ids)
+
+    rows = summary_rows(tasks)
+
+    with transaction.atomic():
+        summaries.delete()
+        created = TaskSummary.objects.bulk_create(
+            [TaskSummary(**row) for row in rows], batch_size=1000
+        )
+    return len(created)
@@ -0,0 +1,101 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import now
+
+from auditlog.models import LogEntry
+
+from compliance.archive import archive_log_entries, audit_history
+
+
+@pytest.fixture(autouse=True)
+def archive_root(settings, tmp_path):
+    settings.AUDITLOG_ARCHIVE_ROOT = tmp_path / "archive"
+    return settings.AUDITLOG_ARCHIVE_ROOT
+
+
+@pytest.fixture
+def task(task):
+    task.task_name = "Renamed return"
+    task.save()
+    return task
+
+
+def age_entries(task, days):
+    LogEntry.objects.get_for_object(task).update(timestamp=now() - timedelta(days=days))
+
+
+@pytest.mark.django_db
+class TestArchiveAuditlog:
+    def test_old_entries_move_to_monthly_files(self, task, archive_root):
+        age_entries(task, 400)
+        ids = set(LogEntry.objects.get_for_object(task).values_list("id", flat=True))
+
+        moved = archive_log_entries(now() - timedelta(days=365), batch_size=1)
+
+        assert moved == 2
+        assert not LogEntry.objects.filter(id__in=ids).exists()
+        files = list((archive_root / "compliance.task").glob("*.jsonl.gz"))
+        assert len(files) == 1
+        with gzip.open(files[0], "rt") as archive:
+            assert {json.loads(line)["id"] for line in archive} == ids
+
+    def test_recent_entries_stay(self, task):
+        moved = archive_log_entries(now() - timedelta(days=365))
+
+        assert moved == 0
+        assert LogEntry.objects.get_for_object(task).count() == 2
+
+    def test_history_reads_archive_only_on_request(self, task, officer):
+        age_entries(task, 400)
+        archive_log_entries(now() - timedelta(days=365))
+        task.task_name = "Return again"
+        task.save()
+
+        assert len(audit_history(task)) == 1
+        records = audit_history(task, include_archived=True)
+        assert [record.archived for record in records] == [False, True, True]
+        assert records[-1].action_label == "create"
+
+    def test_rearchived_batch_is_not_duplicated(self, task):
+        age_entries(task, 400)
+        entries = list(LogEntry.objects.get_for_object(task))
+        archive_log_entries(now() - timedelta(days=365))
+        # As if the delete of an earlier run had been rolled back
+        LogEntry.objects.bulk_create(entries)
+        archive_log_entries(now() - timedelta(days=365))
+
+        assert len(audit_history(task, include_archived=True)) == 2
+
+    def test_command_dry_run_keeps_entries(self, task):
+        age_entries(task, 400)
+        out = StringIO()
+
+        call_command("archive_auditlog", "--dry-run", stdout=out)
+
+        assert "2 entries" in out.getvalue()
+        assert LogEntry.objects.get_for_object(task).count() == 2
+
+    def test_command_before_date(self, task):
+        age_entries(task, 10)
+        before = (now() + timedelta(days=1)).strftime("%d/%m/%Y")
+
+        call_command("archive_auditlog", "--before", before, stdout=StringIO())
+
+        assert not LogEntry.objects.get_for_object(task).exists()
+
+    def test_audit_page_includes_archive_on_demand(self, client, task, officer):
+        age_entries(task, 400)
+        archive_log_entries(now() - timedelta(days=365))
+        client.force_login(officer)
+        url = reverse("task_audit_history", kwargs={"pk": task.pk})
+
+        assert client.get(url).context["entries"] == []
+        response = client.get(url, {"archived": "1"})
+        assert len(response.context["entries"]) == 2
+        assert "Archived" in response.content.decode()
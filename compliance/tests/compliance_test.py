@@ -1,10 +1,12 @@
 from datetime import timedelta
+from io import BytesIO
 
 import pytest
 from django.contrib.auth.models import Group, Permission
 from django.utils import timezone
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from openpyxl import load_workbook
 
 
 from accounts.models import Department, CustomUser
@@ -14,10 +16,9 @@ from compliance.models import (
     RegulatoryPublication,
     TaskRemark,
 )
+from compliance.audit import acting_as
 from compliance.tables import TaskTable
 
-from auditlog.context import set_actor
-
 
 @pytest.fixture
 def normal_user(db):
@@ -60,18 +61,6 @@ def department_dgm_user(db, department_dgm_group, it_department):
     return user
 
 
-@pytest.fixture
-def it_department(db):
-    """Fixture to create a department in the accounts app."""
-    return Department.objects.create(department_name="IT")
-
-
-@pytest.fixture
-def finance_department(db):
-    """Fixture to create a department in the accounts app."""
-    return Department.objects.create(department_name="Finance")
-
-
 @pytest.fixture
 def admin_user_group(db):
     """Creates a group and attaches compliance permissions."""
@@ -302,7 +291,7 @@ class TestGlobalPermissionMatrix:
     ):
         login_user = request.getfixturevalue(user)
 
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(task_name="IT Task", department=it_department)
 
         client.force_login(login_user)
@@ -344,7 +333,7 @@ class TestGlobalPermissionMatrix:
     ):
         login_user = request.getfixturevalue(user)
 
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(
                 task_name="IT Task", department=finance_department
             )
@@ -849,7 +838,7 @@ class TestTaskUI:
     ):
         login_user = request.getfixturevalue(user_fixture)
         client.force_login(login_user)
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(
                 task_name="Test Task",
                 due_date=timezone.now(),
@@ -910,7 +899,7 @@ class TestTaskUI:
     ):
         login_user = request.getfixturevalue(user_fixture)
         client.force_login(login_user)
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(
                 task_name="Test Task",
                 due_date=timezone.now() - timedelta(days=1),
@@ -943,7 +932,7 @@ class TestTaskUI:
         client.force_login(login_user)
 
         # 1. Setup Task
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(
                 task_name="Test Task",
                 due_date=timezone.now().date() - timedelta(days=2),
@@ -989,7 +978,7 @@ class TestTaskUI:
         client.force_login(login_user)
 
         # 1. Setup Task
-        with set_actor(login_user):
+        with acting_as(login_user):
             task = Task.objects.create(
                 task_name="Test Task",
                 due_date=timezone.now().date() + timedelta(days=2),
@@ -1102,7 +1091,7 @@ class TestViewerBasedPermissions:
     def test_viewer_user_cannot_edit_task(self, client, viewer_user, it_department):
         client.force_login(viewer_user)
 
-        with set_actor(viewer_user):
+        with acting_as(viewer_user):
             task = Task.objects.create(
                 task_name="Generic Task",
                 department=it_department,
@@ -1118,7 +1107,7 @@ class TestViewerBasedPermissions:
         assert viewer_user.has_perm("compliance.view_task")
         assert viewer_user.has_perm("compliance.can_view_as_compliance")
 
-        with set_actor(viewer_user):
+        with acting_as(viewer_user):
             task = Task.objects.create(
                 task_name="Generic Task",
                 department=it_department,
@@ -1351,6 +1340,8 @@ class TestBulkBoardMeetingView:
         task1.refresh_from_db()
         assert task1.board_meeting_date == meeting_date
         assert task1.board_meeting_date_flag is True
+        messages = list(response.wsgi_request._messages)
+        assert any("1 task(s) updated." in m.message for m in messages)
 
     def test_unauthorized_user_is_forbidden(self, client, viewer_user, it_department):
         """Verify user without correct perm gets a 403."""
@@ -1601,3 +1592,191 @@ def test_user_without_legacy_type_can_still_edit(admin_user_group, it_department
 
     # If this passes, you know your can_edit logic is purely permission-based!
     assert task.can_edit(clean_user) is True
+
+
+@pytest.mark.django_db
+class TestTaskListDataTables:
+    @pytest.fixture
+    def tasks(self, it_department, finance_department):
+        today = timezone.now().date()
+        return [
+            Task.objects.create(
+                task_name=f"Return {n:02d}",
+                department=it_department if n % 2 else finance_department,
+                current_status="pending",
+                due_date=today + timedelta(days=n),
+            )
+            for n in range(30)
+        ]
+
+    def get_json(self, client, **params):
+        params.setdefault("draw", 3)
+        response = client.get(
+            reverse("task_list", kwargs={"filter": "upcoming"}), params
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_html_page_carries_only_the_first_page(self, client, viewer_user, tasks):
+        client.force_login(viewer_user)
+        response = client.get(reverse("task_list", kwargs={"filter": "upcoming"}))
+
+        content = response.content.decode()
+        assert "Return 01" in content
+        assert "Return 29" not in content
+        assert response.context["records_total"] == 29
+
+    def test_rows_load_only_rendered_columns(
+        self, client, viewer_user, tasks, django_assert_max_num_queries
+    ):
+        client.force_login(viewer_user)
+        with django_assert_max_num_queries(60) as captured:
+            client.get(reverse("task_list", kwargs={"filter": "upcoming"}))
+
+        task_queries = [
+            query["sql"]
+            for query in captured.captured_queries
+            if '"compliance_task"' in query["sql"]
+        ]
+        # Fingerprint (which gives the count too) and page: rendering the
+        # page must not lazily load any deferred column
+        assert len(task_queries) == 2
+        rows = [sql for sql in task_queries if '"compliance_task"."task_name"' in sql]
+        assert rows
+        for column in ("reason_for_delay", "return_number", "inbound_email"):
+            assert all(column not in sql for sql in rows)
+
+    def test_json_page(self, client, viewer_user, tasks):
+        client.force_login(viewer_user)
+        data = self.get_json(client, start=10, length=5)
+
+        assert data["draw"] == 3
+        assert data["recordsTotal"] == 29
+        assert data["recordsFiltered"] == 29
+        assert [row[2] for row in data["data"]] == [
+            f"Return {n:02d}" for n in range(11, 16)
+        ]
+
+    def test_json_pages_share_one_count(
+        self, client, viewer_user, tasks, django_assert_max_num_queries
+    ):
+        client.force_login(viewer_user)
+        self.get_json(client, start=0, length=5)
+
+        with django_assert_max_num_queries(60) as captured:
+            data = self.get_json(client, start=5, length=5)
+
+        assert data["recordsTotal"] == 29
+        assert not [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith("SELECT COUNT(")
+        ]
+
+    def test_json_ordering_and_search(self, client, viewer_user, tasks):
+        client.force_login(viewer_user)
+        # Column 5 is due_date
+        data = self.get_json(
+            client,
+            **{
+                "order[0][column]": 5,
+                "order[0][dir]": "desc",
+                "search[value]": "finance",
+                "length": 3,
+            },
+        )
+
+        assert data["recordsFiltered"] == 14
+        assert [row[2] for row in data["data"]] == [
+            "Return 28",
+            "Return 26",
+            "Return 24",
+        ]
+
+    def test_json_is_scoped_to_department(self, client, department_user, tasks):
+        client.force_login(department_user)
+        data = self.get_json(client, length=100)
+
+        assert data["recordsTotal"] == 15
+        assert {row[1] for row in data["data"]} == {"IT"}
+
+    def test_json_escapes_cells(self, client, viewer_user, it_department):
+        Task.objects.create(
+            task_name="<b>Return</b>",
+            department=it_department,
+            due_date=timezone.now().date() + timedelta(days=1),
+        )
+        client.force_login(viewer_user)
+
+        assert self.get_json(client)["data"][0][2] == "&lt;b&gt;Return&lt;/b&gt;"
+
+    def test_json_follows_cursors(self, client, viewer_user, tasks):
+        client.force_login(viewer_user)
+        first = self.get_json(client, length=5)
+        assert first["previous"] is None
+
+        second = self.get_json(client, start=5, length=5, after=first["next"])
+        assert [row[2] for row in second["data"]] == [
+            f"Return {n:02d}" for n in range(6, 11)
+        ]
+
+        back = self.get_json(client, start=0, length=5, before=second["previous"])
+        assert back["data"] == first["data"]
+
+
+@pytest.mark.django_db
+class TestTaskListExport:
+    @pytest.fixture
+    def tasks(self, it_department, finance_department):
+        today = timezone.now().date()
+        return [
+            Task.objects.create(
+                task_name=f"Return {n:02d}",
+                department=it_department if n % 2 else finance_department,
+                current_status="pending",
+                type_of_compliance="monthly",
+                priority=3,
+                due_date=today + timedelta(days=n),
+            )
+            for n in range(1, 40)
+        ]
+
+    def export(self, client, export_format):
+        response = client.get(
+            reverse("task_list", kwargs={"filter": "upcoming"}),
+            {"export": export_format},
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        return response
+
+    def test_csv_export_streams_every_row(self, client, viewer_user, tasks):
+        client.force_login(viewer_user)
+        response = self.export(client, "csv")
+
+        assert "tasks-upcoming-all-" in response["Content-Disposition"]
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 40
+        assert lines[0].startswith("Type of compliance,Department,Task name")
+        assert lines[1] == (
+            "Monthly,IT,Return 01,,Pending,High,"
+            f"{tasks[0].due_date.strftime('%d/%m/%Y')},"
+        )
+
+    def test_xlsx_export(self, client, department_user, tasks):
+        client.force_login(department_user)
+        response = self.export(client, "xlsx")
+
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook["Tasks"].values)
+        # Department users only export their own department
+        assert len(rows) == 21
+        assert rows[1][:3] == ("Monthly", "IT", "Return 01")
+        assert rows[1][6].date() == tasks[0].due_date
+
+    def test_export_requires_list_permission(self, client, normal_user, tasks):
+        client.force_login(normal_user)
+        response = client.get(
+            reverse("task_list", kwargs={"filter": "upcoming"}), {"export": "csv"}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,51 @@
+import pytest
+
+from accounts.models import CustomUser, Department
+from compliance.models import Task
+
+
+@pytest.fixture
+def it_department(db):
+    """Fixture to create a department in the accounts app."""
+    return Department.objects.create(department_name="IT")
+
+
+@pytest.fixture
+def finance_department(db):
+    """Fixture to create a department in the accounts app."""
+    return Department.objects.create(department_name="Finance")
+
+
+@pytest.fixture
+def officer(db):
+    return CustomUser.objects.create(username="officer", is_superuser=True)
+
+
+@pytest.fixture
+def create_task(db):
+    """Creates a monthly task in a department; keyword arguments override."""
+
+    def create(department, **kwargs):
+        kwargs.setdefault("task_name", "Return")
+        kwargs.setdefault("type_of_compliance", "monthly")
+        return Task.objects.create(department=department, **kwargs)
+
+    return create
+
+
+@pytest.fixture
+def make_tasks(create_task):
+    """Creates `count` numbered tasks of a department in one status."""
+
+    def make(department, status, count):
+        return [
+            create_task(department, task_name=f"Return {n}", current_status=status)
+            for n in range(count)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def task(create_task, it_department):
+    return create_task(it_department)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils.timezone import localdate
+
+from compliance.counters import (
+    get_task_counts,
+    task_counts_cache_key,
+    task_counts_scope,
+)
+from compliance.models import Task
+from compliance.signals import tasks_bulk_changed
+
+
+@pytest.mark.django_db
+class TestTaskCounts:
+    def test_warm_cache_costs_no_queries(
+        self, it_department, django_assert_num_queries, create_task
+    ):
+        create_task(it_department, due_date=localdate())
+        counts = get_task_counts(department_id=it_department.id)
+
+        with django_assert_num_queries(0):
+            assert get_task_counts(department_id=it_department.id) == counts
+
+        assert counts["due_today_count"] == 1
+        assert counts["overdue_count"] == 0
+
+    def test_invalidation_waits_for_commit(
+        self, it_department, django_capture_on_commit_callbacks, create_task
+    ):
+        get_task_counts(department_id=it_department.id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            create_task(it_department)
+            # Not yet committed: readers keep the counts from before
+            assert (
+                get_task_counts(department_id=it_department.id)["pending_tasks_count"]
+                == 0
+            )
+        for callback in callbacks:
+            callback()
+
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 1
+        )
+
+    def test_counts_read_before_the_commit_are_not_served(
+        self, it_department, django_capture_on_commit_callbacks, create_task
+    ):
+        stale = get_task_counts(department_id=it_department.id)
+        # A reader keyed its counts just before the change committed ...
+        key = task_counts_cache_key(task_counts_scope(it_department.id), localdate())
+        with django_capture_on_commit_callbacks(execute=True):
+            create_task(it_department)
+        # ... and stores them only afterwards
+        cache.set(key, stale)
+
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 1
+        )
+
+    def test_scopes_are_counted_separately(
+        self, it_department, finance_department, create_task
+    ):
+        create_task(it_department)
+        create_task(finance_department)
+        create_task(finance_department)
+
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 1
+        )
+        assert (
+            get_task_counts(department_id=finance_department.id)["pending_tasks_count"]
+            == 2
+        )
+        assert get_task_counts(unscoped=True)["pending_tasks_count"] == 3
+
+    def test_task_save_invalidates_its_scopes(
+        self,
+        it_department,
+        finance_department,
+        django_capture_on_commit_callbacks,
+        create_task,
+    ):
+        task = create_task(it_department, due_date=localdate() - timedelta(days=1))
+        get_task_counts(department_id=it_department.id)
+        get_task_counts(department_id=finance_department.id)
+        get_task_counts(unscoped=True)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.department = finance_department
+            task.current_status = "to_be_approved"
+            task.save()
+
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 0
+        )
+        finance_counts = get_task_counts(department_id=finance_department.id)
+        assert finance_counts["approval_pending_count"] == 1
+        assert get_task_counts(unscoped=True)["overdue_count"] == 0
+
+    def test_bulk_change_signal_invalidates(
+        self, it_department, django_capture_on_commit_callbacks, create_task
+    ):
+        task = create_task(it_department)
+        get_task_counts(department_id=it_department.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.filter(pk=task.pk).update(current_status="revision")
+            tasks_bulk_changed.send(sender=Task, department_ids={it_department.id})
+
+        assert get_task_counts(department_id=it_department.id)["revision_count"] == 1
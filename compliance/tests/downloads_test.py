@@ -0,0 +1,179 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.files.base import ContentFile
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from compliance.downloads import parse_range
+from compliance.models import Template
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.SENDFILE_HEADER = None
+    settings.SENDFILE_URL = "/protected-media/"
+
+
+@pytest.fixture
+def task(task):
+    task.outbound_data_document.save("return data.xlsx", ContentFile(CONTENT))
+    return task
+
+
+def document_url(task, field="outbound_data_document"):
+    return reverse("task_document", kwargs={"pk": task.pk, "field": field})
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=1000-", (1000, 1023)),
+        ("bytes=-24", (1000, 1023)),
+        ("bytes=1000-5000", (1000, 1023)),
+        ("bytes=2000-", False),
+        ("bytes=-0", False),
+        ("bytes=0-1,5-6", None),
+        ("bytes=9-0", None),
+        ("items=0-9", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1024) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=-24", "bytes=0-", "bytes=0-9"])
+def test_parse_range_of_empty_file(header):
+    assert parse_range(header, 0) is False
+
+
+@pytest.mark.django_db
+class TestTaskDocument:
+    def test_streams_file_without_sendfile(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(document_url(task))
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == CONTENT
+        assert response["Accept-Ranges"] == "bytes"
+        assert response["Content-Length"] == str(len(CONTENT))
+        assert 'filename="return_data.xlsx"' in response["Content-Disposition"]
+
+    def test_range_request(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(document_url(task), HTTP_RANGE="bytes=10-19")
+
+        assert response.status_code == 206
+        assert b"".join(response.streaming_content) == CONTENT[10:20]
+        assert response["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+        assert response["Content-Length"] == "10"
+
+    def test_unsatisfiable_range(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(document_url(task), HTTP_RANGE="bytes=5000-")
+
+        assert response.status_code == 416
+        assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+    def test_stale_if_range_sends_whole_file(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(
+            document_url(task),
+            HTTP_RANGE="bytes=10-19",
+            HTTP_IF_RANGE="Wed, 21 Oct 2015 07:28:00 GMT",
+        )
+
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "header, value",
+        [("X-Accel-Redirect", "/protected-media/"), ("X-Sendfile", None)],
+    )
+    def test_hands_transfer_to_web_server(
+        self, client, settings, officer, task, header, value
+    ):
+        settings.SENDFILE_HEADER = header
+        client.force_login(officer)
+
+        response = client.get(document_url(task))
+
+        name = task.outbound_data_document.name
+        if value is None:
+            assert response[header] == task.outbound_data_document.path
+        else:
+            assert response[header] == value + name
+        assert response.content == b""
+
+    def test_other_department_is_refused(self, client, task, finance_department):
+        user = CustomUser.objects.create(
+            username="finance", department=finance_department
+        )
+        user.user_permissions.add(
+            Permission.objects.get(codename="can_edit_as_department")
+        )
+        client.force_login(user)
+
+        assert client.get(document_url(task)).status_code == 403
+
+    def test_login_required(self, client, task):
+        assert client.get(document_url(task)).status_code == 302
+
+    def test_missing_document_and_unknown_field(self, client, officer, task):
+        client.force_login(officer)
+
+        assert client.get(document_url(task, "data_document")).status_code == 404
+        assert client.get(document_url(task, "task_name")).status_code == 404
+
+    def test_detail_page_links_to_view(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(reverse("task_detail", kwargs={"pk": task.pk}))
+
+        assert document_url(task) in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestTemplateDocument:
+    @pytest.fixture
+    def template(self, it_department):
+        template = Template.objects.create(task_name="Return", department=it_department)
+        template.circular_document.save("circular.pdf", ContentFile(CONTENT))
+        return template
+
+    def url(self, template, field="circular_document"):
+        return reverse("template_document", kwargs={"pk": template.pk, "field": field})
+
+    def test_streams_file(self, client, officer, template):
+        client.force_login(officer)
+
+        response = client.get(self.url(template))
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == CONTENT
+
+    def test_needs_view_template_permission(self, client, template):
+        client.force_login(CustomUser.objects.create(username="viewer"))
+
+        assert client.get(self.url(template)).status_code == 403
+
+    def test_missing_document_and_unknown_field(self, client, officer, template):
+        client.force_login(officer)
+
+        url = self.url(template, "data_document_template")
+        assert client.get(url).status_code == 404
+        assert client.get(self.url(template, "task_name")).status_code == 404
+
+    def test_detail_page_links_to_view(self, client, officer, template):
+        client.force_login(officer)
+
+        response = client.get(reverse("template_detail", kwargs={"pk": template.pk}))
+
+        assert self.url(template) in response.content.decode()
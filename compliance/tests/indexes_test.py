@@ -0,0 +1,91 @@
+import re
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from compliance.management.commands.benchmark_task_indexes import (
+    LIST_VIEWS,
+    Command,
+)
+from compliance.models import Task
+from compliance.pagination import keyset_ordering
+
+
+@pytest.mark.django_db
+class TestTaskListIndexes:
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="Reads PostgreSQL query plans"
+    )
+    @pytest.mark.parametrize("label, view_class, date_filter", LIST_VIEWS)
+    def test_list_page_uses_a_task_index(self, label, view_class, date_filter):
+        qs = Command().list_queryset(view_class, date_filter, "monthly", None)
+
+        # The test table is tiny, so the planner would rightly read it whole;
+        # with sequential scans priced out only a missing index shows one
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = qs.order_by(*keyset_ordering())[:26].explain(format="text")
+
+        assert not re.search(rf"Seq Scan on {Task._meta.db_table}\b", plan)
+        assert any(index.name in plan for index in Task._meta.indexes)
+
+    def test_benchmark_needs_postgres(self, monkeypatch):
+        monkeypatch.setattr(connection, "vendor", "sqlite")
+
+        with pytest.raises(CommandError):
+            call_command("benchmark_task_indexes", "--rows", "10")
+
+    def test_failed_test_db_creation_restores_the_connection(self, monkeypatch):
+        database_name = connection.settings_dict["NAME"]
+        dropped = []
+
+        def create_test_db(**kwargs):
+            # Switched over to the test database, then failed to migrate it
+            connection.settings_dict["NAME"] = "test_broken"
+            raise RuntimeError("migrate failed")
+
+        def destroy_test_db(old_database_name, **kwargs):
+            dropped.append(old_database_name)
+            raise RuntimeError("drop failed")
+
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+        monkeypatch.setattr(connection.creation, "create_test_db", create_test_db)
+        monkeypatch.setattr(connection.creation, "destroy_test_db", destroy_test_db)
+
+        with pytest.raises(RuntimeError, match="drop failed"):
+            call_command("benchmark_task_indexes", "--rows", "10")
+
+        assert dropped == [database_name]
+        assert connection.settings_dict["NAME"] == database_name
+
+    def test_plan_scans_include_bitmap_index_scans(self):
+        plan = {
+            "Node Type": "Limit",
+            "Plan Rows": 26,
+            "Plans": [
+                {
+                    "Node Type": "Bitmap Heap Scan",
+                    "Relation Name": Task._meta.db_table,
+                    "Plan Rows": 40,
+                    "Plans": [
+                        {
+                            "Node Type": "Bitmap Index Scan",
+                            "Index Name": "task_dept_status_due_idx",
+                            "Plan Rows": 45,
+                        }
+                    ],
+                },
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "accounts_department",
+                    "Plan Rows": 1,
+                },
+            ],
+        }
+
+        assert Command().table_scans(plan) == [
+            ("Bitmap Heap Scan", None, Task._meta.db_table, 40),
+            ("Bitmap Index Scan", "task_dept_status_due_idx", None, 45),
+        ]
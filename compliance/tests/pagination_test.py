@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from compliance.models import Task
+from compliance.pagination import decode_cursor, keyset_ordering, keyset_page
+
+
+@pytest.fixture
+def tasks(create_task, it_department):
+    # Repeated and missing due dates and repeated priorities, so the keyset
+    # has to break ties on id and place the tasks without a due date last
+    return [
+        create_task(
+            it_department,
+            task_name=f"Return {n}",
+            due_date=None if n % 7 == 0 else date(2026, 3, 1) + timedelta(days=n % 4),
+            priority=n % 3 + 1,
+        )
+        for n in range(40)
+    ]
+
+
+def expected_order():
+    return list(Task.objects.order_by(*keyset_ordering()).values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+class TestKeysetPage:
+    def test_walking_forward_visits_every_task_once(self, tasks):
+        seen = []
+        rows, next_cursor, prev_cursor = keyset_page(Task.objects.all(), 6)
+        assert prev_cursor is None
+        while True:
+            seen += [task.id for task in rows]
+            if next_cursor is None:
+                break
+            rows, next_cursor, prev_cursor = keyset_page(
+                Task.objects.all(), 6, after=next_cursor
+            )
+            assert prev_cursor is not None
+
+        assert seen == expected_order()
+
+    def test_walking_backward_matches_offset_pages(self, tasks):
+        order = expected_order()
+        rows, _, prev_cursor = keyset_page(Task.objects.all(), 6, offset=36)
+        assert [task.id for task in rows] == order[36:]
+
+        start = 36
+        while prev_cursor is not None:
+            start -= 6
+            rows, _, prev_cursor = keyset_page(
+                Task.objects.all(), 6, before=prev_cursor
+            )
+            assert [task.id for task in rows] == order[start : start + 6]
+        assert start == 0
+
+    def test_deep_page_costs_one_query(self, tasks, django_assert_num_queries):
+        _, next_cursor, _ = keyset_page(Task.objects.all(), 6, offset=30)
+
+        with django_assert_num_queries(1):
+            rows, _, _ = keyset_page(Task.objects.all(), 6, after=next_cursor)
+        assert [task.id for task in rows] == expected_order()[36:]
+
+    def test_dated_rows_are_seeked_as_one_row_value(self, tasks):
+        _, next_cursor, _ = keyset_page(Task.objects.all(), 6)
+
+        with CaptureQueriesContext(connection) as captured:
+            keyset_page(Task.objects.all(), 6, after=next_cursor)
+
+        (sql,) = [query["sql"] for query in captured.captured_queries]
+        assert (
+            '("compliance_task"."due_date", "compliance_task"."priority", '
+            '"compliance_task"."id") >'
+        ) in sql
+        assert " OR " not in sql
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WzEsMl0"])
+    def test_invalid_cursor_is_ignored(self, cursor):
+        assert decode_cursor(cursor) is None
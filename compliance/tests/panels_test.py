@@ -0,0 +1,231 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from compliance.models import Task, TaskRemark, Template
+from compliance.transitions import apply_transition
+
+
+@pytest.fixture
+def task(it_department, create_task):
+    template = Template.objects.create(
+        task_name="Monthly return", department=it_department
+    )
+    for n in range(3):
+        create_task(it_department, task_name=f"Monthly return {n}", template=template)
+    return Task.objects.filter(template=template).first()
+
+
+def panel_url(task, panel):
+    return reverse("task_panel", kwargs={"pk": task.pk, "panel": panel})
+
+
+@pytest.mark.django_db
+class TestTaskPanels:
+    def test_detail_page_defers_panels(self, client, officer, task):
+        client.force_login(officer)
+        url = reverse("task_detail", kwargs={"pk": task.pk})
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        # Session, user and the task itself
+        assert len(captured) == 3
+
+        content = response.content.decode()
+        for panel in ["related", "remarks", "history"]:
+            assert panel_url(task, panel) in content
+        assert "Monthly return 1" not in content
+
+    def test_related_panel(self, client, officer, task):
+        client.force_login(officer)
+
+        response = client.get(panel_url(task, "related"))
+
+        content = response.content.decode()
+        assert "Monthly return 1" in content
+        assert response.headers["ETag"]
+        assert "no-cache" in response.headers["Cache-Control"]
+
+    def test_unchanged_panel_answers_304(self, client, officer, task):
+        client.force_login(officer)
+        etag = client.get(panel_url(task, "remarks")).headers["ETag"]
+
+        response = client.get(panel_url(task, "remarks"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        TaskRemark.objects.create(task=task, text="Filed late", created_by=officer)
+        response = client.get(panel_url(task, "remarks"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "Filed late" in response.content.decode()
+
+    def test_panel_requires_view_permission(self, client, task):
+        user = CustomUser.objects.create(username="outsider")
+        user.user_permissions.add(
+            Permission.objects.get(codename="can_edit_as_department")
+        )
+        client.force_login(user)
+
+        assert client.get(panel_url(task, "history")).status_code == 403
+
+    def test_unknown_panel(self, client, officer, task):
+        client.force_login(officer)
+
+        assert client.get(panel_url(task, "files")).status_code == 404
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def revalidate(self, client, url, response):
+        return client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response.headers["ETag"],
+            HTTP_IF_MODIFIED_SINCE=response.headers.get("Last-Modified", ""),
+        )
+
+    def test_unchanged_list_answers_304(self, client, officer, task):
+        client.force_login(officer)
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        response = client.get(url)
+        assert response.headers["Last-Modified"]
+
+        with CaptureQueriesContext(connection) as captured:
+            revalidated = self.revalidate(client, url, response)
+        # Session, user and the list fingerprint
+        assert len(captured) == 3
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    def test_status_change_refreshes_list(
+        self, client, officer, task, django_capture_on_commit_callbacks
+    ):
+        client.force_login(officer)
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        response = client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.current_status = "to_be_approved"
+            task.save()
+
+        assert self.revalidate(client, url, response).status_code == 200
+
+    def test_change_in_other_department_refreshes_unscoped_list(
+        self,
+        client,
+        officer,
+        task,
+        django_capture_on_commit_callbacks,
+        create_task,
+        finance_department,
+    ):
+        client.force_login(officer)
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        response = client.get(url)
+
+        # Only moves the sidebar counters of an unscoped user
+        with django_capture_on_commit_callbacks(execute=True):
+            create_task(
+                finance_department,
+                task_name="Finance return",
+                current_status="review",
+            )
+
+        assert self.revalidate(client, url, response).status_code == 200
+
+    def test_detail_page(self, client, officer, task):
+        client.force_login(officer)
+        url = reverse("task_detail", kwargs={"pk": task.pk})
+        response = client.get(url)
+
+        assert self.revalidate(client, url, response).status_code == 304
+
+        task.task_name = "Renamed"
+        task.save()
+        assert self.revalidate(client, url, response).status_code == 200
+
+    def test_validators_are_per_user(self, client, officer, task):
+        client.force_login(officer)
+        url = reverse("task_detail", kwargs={"pk": task.pk})
+        response = client.get(url)
+
+        other = CustomUser.objects.create(username="other", is_superuser=True)
+        client.force_login(other)
+        assert self.revalidate(client, url, response).status_code == 200
+
+
+@pytest.mark.django_db
+class TestTaskListFragment:
+    @pytest.fixture
+    def department_users(self, task):
+        permission = Permission.objects.get(codename="can_edit_as_department")
+        users = []
+        for n in range(2):
+            user = CustomUser.objects.create(
+                username=f"dept_user_{n}", department=task.department
+            )
+            user.user_permissions.add(
+                permission, Permission.objects.get(codename="view_task")
+            )
+            users.append(user)
+        return users
+
+    def test_table_is_rendered_once_per_scope(self, client, task, department_users):
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        client.force_login(department_users[0])
+        first = client.get(url).content.decode()
+
+        client.force_login(department_users[1])
+        with CaptureQueriesContext(connection) as captured:
+            second = client.get(url).content.decode()
+
+        assert "Monthly return 0" in second
+        assert not [
+            query
+            for query in captured.captured_queries
+            if '"compliance_task"."task_name"' in query["sql"]
+        ]
+        assert first.count("Monthly return") == second.count("Monthly return")
+
+    def test_task_save_invalidates_fragment(
+        self, client, task, department_users, django_capture_on_commit_callbacks
+    ):
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        client.force_login(department_users[0])
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.task_name = "Quarterly return"
+            task.save()
+
+        client.force_login(department_users[1])
+        assert "Quarterly return" in client.get(url).content.decode()
+
+    def test_bulk_transition_invalidates_fragment(
+        self, client, officer, task, django_capture_on_commit_callbacks
+    ):
+        Task.objects.update(current_status="to_be_approved")
+        client.force_login(officer)
+        url = reverse("task_list_approval_pending")
+        assert "Monthly return 0" in client.get(url).content.decode()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            apply_transition("approve", Task.objects.values_list("id", flat=True))
+
+        assert "Monthly return 0" not in client.get(url).content.decode()
+
+    def test_department_rename_invalidates_fragment(
+        self, client, task, department_users, django_capture_on_commit_callbacks
+    ):
+        url = reverse("task_list", kwargs={"filter": "upcoming"})
+        client.force_login(department_users[0])
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.department.department_name = "Information Technology"
+            task.department.save()
+
+        assert "Information Technology" in client.get(url).content.decode()
@@ -0,0 +1,102 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser, Group, Permission
+
+from accounts.models import CustomUser
+from compliance.permissions import (
+    ANONYMOUS_PROFILE,
+    PermissionProfile,
+    permission_profile,
+    permissions_version,
+)
+
+
+@pytest.fixture
+def department_group(db):
+    group = Group.objects.create(name="Department User")
+    group.permissions.add(Permission.objects.get(codename="can_edit_as_department"))
+    return group
+
+
+@pytest.fixture
+def officer(it_department, department_group):
+    """A department user, in place of the shared superuser officer."""
+    user = CustomUser.objects.create(username="officer", department=it_department)
+    user.groups.add(department_group)
+    return user
+
+
+def fresh(user):
+    """The same user as a later request would load it."""
+    return CustomUser.objects.get(pk=user.pk)
+
+
+@pytest.mark.django_db
+class TestPermissionProfile:
+    def test_profile_reflects_roles(self, officer, it_department):
+        profile = permission_profile(officer)
+
+        assert profile.edit_as_department
+        assert not profile.edit_as_compliance
+        assert profile.department_id == it_department.id
+        assert profile.department_scoped
+
+    def test_anonymous_and_inactive_users_have_no_roles(self, officer):
+        assert permission_profile(AnonymousUser()) is ANONYMOUS_PROFILE
+
+        officer.is_active = False
+        officer.save()
+        assert not permission_profile(fresh(officer)).edit_as_department
+
+    def test_profile_is_reused_across_requests(
+        self, officer, django_assert_num_queries
+    ):
+        permission_profile(fresh(officer))
+
+        user = fresh(officer)
+        with django_assert_num_queries(0):
+            permission_profile(user)
+
+    def test_group_changes_invalidate_profiles(
+        self, officer, department_group, django_capture_on_commit_callbacks
+    ):
+        permission_profile(fresh(officer))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            department_group.permissions.add(
+                Permission.objects.get(codename="can_mark_as_pending")
+            )
+        assert permission_profile(fresh(officer)).mark_as_pending
+
+        with django_capture_on_commit_callbacks(execute=True):
+            officer.groups.remove(department_group)
+        assert not permission_profile(fresh(officer)).edit_as_department
+
+    def test_invalidation_waits_for_commit(
+        self, officer, department_group, django_capture_on_commit_callbacks
+    ):
+        version = permissions_version()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            officer.groups.remove(department_group)
+            # Readers before the commit keep the current version
+            assert permissions_version() == version
+        for callback in callbacks:
+            callback()
+
+        assert permissions_version() != version
+
+    def test_department_change_is_picked_up(self, officer, finance_department):
+        permission_profile(fresh(officer))
+
+        officer.department = finance_department
+        officer.save()
+
+        assert permission_profile(fresh(officer)).department_id == finance_department.id
+
+    def test_task_helpers_accept_a_profile(self, officer, task):
+        profile = permission_profile(officer)
+
+        assert task.can_view(profile)
+        assert task.can_edit(profile)
+        assert not task.can_mark_as_pending(profile)
+        assert not task.can_view(PermissionProfile(is_authenticated=True))
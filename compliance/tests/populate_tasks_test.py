@@ -0,0 +1,311 @@
+from datetime import date, datetime, timedelta
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.utils.timezone import localdate, make_aware
+
+from accounts.models import CustomUser
+from compliance.management.commands.run_scheduler import Command as RunScheduler
+from compliance.models import Month, Task, TaskPopulationRun, Template
+from compliance.utils import compliance_period_start, holiday_calendar
+
+backfill_period_start = import_module(
+    "compliance.migrations.0010_task_period_start"
+).backfill_period_start
+
+
+@pytest.fixture
+def system_user(db):
+    """populate_tasks attributes generated tasks to user id 1."""
+    return CustomUser.objects.create(id=1, username="system")
+
+
+@pytest.fixture
+def monthly_templates(it_department):
+    holiday_calendar.invalidate()
+    return [
+        Template.objects.create(
+            task_name=f"Monthly return {n}",
+            department=it_department,
+            recurring_interval="monthly",
+            recurring_task_status="Active",
+            type_of_compliance="monthly",
+            type_of_due_date=type_of_due_date,
+            due_date_days=7,
+        )
+        for n, type_of_due_date in enumerate(["calendar", "working", "board_meeting"])
+    ]
+
+
+def populate(*args):
+    out = StringIO()
+    call_command("populate_tasks", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize(
+    "recurring_interval, run_date, expected",
+    [
+        ("daily", date(2026, 3, 18), date(2026, 3, 18)),
+        ("weekly", date(2026, 3, 18), date(2026, 3, 16)),
+        ("fortnightly", date(2026, 3, 15), date(2026, 3, 1)),
+        ("fortnightly", date(2026, 3, 18), date(2026, 3, 16)),
+        ("fortnightly", date(2026, 2, 28), date(2026, 2, 16)),
+        ("monthly", date(2026, 3, 18), date(2026, 3, 1)),
+        ("annual", date(2026, 3, 18), date(2026, 3, 1)),
+        ("quarterly", date(2026, 5, 18), date(2026, 4, 1)),
+        ("halfyearly", date(2026, 9, 18), date(2026, 7, 1)),
+    ],
+)
+def test_compliance_period_start(recurring_interval, run_date, expected):
+    assert compliance_period_start(recurring_interval, run_date) == expected
+
+
+@pytest.mark.django_db
+class TestPopulateTasks:
+    def test_rerun_for_same_period_is_skipped(self, system_user, monthly_templates):
+        output = populate("monthly", "--run-date", "02/03/2026")
+        assert "3 created, 0 skipped" in output
+
+        # A retry later in the same month must not duplicate anything
+        output = populate("monthly", "--run-date", "05/03/2026", "--batch-size", "2")
+        assert "0 created, 3 skipped" in output
+
+        assert Task.objects.count() == 3
+        assert set(Task.objects.values_list("period_start", flat=True)) == {
+            date(2026, 3, 1)
+        }
+
+    def test_next_period_creates_new_tasks(self, system_user, monthly_templates):
+        populate("monthly", "--run-date", "02/03/2026")
+        output = populate("monthly", "--run-date", "01/04/2026")
+
+        assert "3 created, 0 skipped" in output
+        assert Task.objects.count() == 6
+
+    def test_generated_task_copies_template(self, system_user, monthly_templates):
+        populate("monthly", "--run-date", "02/03/2026")
+
+        calendar_task, working_task, board_task = (
+            Task.objects.get(template=template) for template in monthly_templates
+        )
+        assert calendar_task.task_name == "Monthly return 0"
+        assert calendar_task.department == monthly_templates[0].department
+        assert calendar_task.current_status == "pending"
+        assert calendar_task.created_by == system_user
+        assert calendar_task.due_date == date(2026, 3, 8)
+        assert working_task.due_date == date(2026, 3, 10)
+        assert board_task.due_date is None
+
+    def test_fortnightly_runs_13_days_apart_both_create(
+        self, system_user, it_department
+    ):
+        template = Template.objects.create(
+            task_name="Fortnightly return",
+            department=it_department,
+            recurring_interval="fortnightly",
+            recurring_task_status="Active",
+            type_of_compliance="fortnightly",
+        )
+
+        populate("fortnightly", "--run-date", "03/03/2026")
+        output = populate("fortnightly", "--run-date", "16/03/2026")
+
+        assert "1 created, 0 skipped" in output
+        assert set(
+            Task.objects.filter(template=template).values_list(
+                "period_start", flat=True
+            )
+        ) == {date(2026, 3, 1), date(2026, 3, 16)}
+
+    def test_annual_templates_are_populated_in_their_month(
+        self, system_user, it_department
+    ):
+        march = Month.objects.create(month_name="March")
+        template = Template.objects.create(
+            task_name="Annual return",
+            department=it_department,
+            recurring_interval="annual",
+            recurring_task_status="Active",
+            type_of_compliance="annual",
+        )
+        template.repeat_month.add(march)
+
+        populate("monthly", "--run-date", "01/02/2026")
+        assert not Task.objects.filter(template=template).exists()
+
+        populate("monthly", "--run-date", "01/03/2026")
+        populate("monthly", "--run-date", "15/03/2026")
+        assert Task.objects.filter(template=template).count() == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("interval", ["weekly", "fortnightly", "monthly"])
+def test_migration_keys_generated_tasks_like_populate_tasks(
+    system_user, it_department, interval
+):
+    template = Template.objects.create(
+        task_name=f"{interval} return",
+        department=it_department,
+        recurring_interval=interval,
+        type_of_compliance=interval,
+    )
+    run_dates = [date(2026, 10, 1), date(2026, 11, 20)]
+    for run_date in run_dates:
+        task = Task.objects.create(
+            task_name=template.task_name,
+            template=template,
+            department=it_department,
+            created_by=system_user,
+        )
+        Task.objects.filter(pk=task.pk).update(
+            created_on=make_aware(datetime.combine(run_date, datetime.min.time()))
+        )
+
+    backfill_period_start(apps, None)
+
+    assert sorted(
+        Task.objects.filter(template=template).values_list("period_start", flat=True)
+    ) == [compliance_period_start(interval, run_date) for run_date in run_dates]
+
+
+@pytest.mark.django_db
+class TestPopulateTasksBackfill:
+    @pytest.fixture
+    def templates(self, system_user, it_department):
+        holiday_calendar.invalidate()
+        march = Month.objects.create(month_name="March")
+        created = {}
+        for interval in [
+            "daily",
+            "weekly",
+            "fortnightly",
+            "monthly",
+            "quarterly",
+            "annual",
+        ]:
+            created[interval] = Template.objects.create(
+                task_name=f"{interval} return",
+                department=it_department,
+                recurring_interval=interval,
+                recurring_task_status="Active",
+                type_of_compliance=interval,
+                type_of_due_date="working",
+                due_date_days=3,
+            )
+        created["annual"].repeat_month.add(march)
+        return created
+
+    def test_backfill_enumerates_every_occurrence(self, templates):
+        output = populate("--from", "01/01/2026", "--to", "31/03/2026")
+
+        assert "Daily: 90 occurrence(s), 90 created" in output
+        counts = {
+            interval: Task.objects.filter(template=template).count()
+            for interval, template in templates.items()
+        }
+        # Mondays, and 1sts and 16ths, between 1 Jan and 31 Mar 2026
+        assert counts == {
+            "daily": 90,
+            "weekly": 13,
+            "fortnightly": 6,
+            "monthly": 3,
+            "quarterly": 1,
+            "annual": 1,
+        }
+
+    def test_backfill_is_idempotent_with_regular_runs(self, templates):
+        populate("weekly", "--run-date", "18/03/2026")
+
+        output = populate("weekly", "--from", "01/03/2026", "--to", "31/03/2026")
+
+        assert "Weekly: 5 occurrence(s), 4 created, 1 skipped" in output
+        assert Task.objects.filter(template=templates["weekly"]).count() == 5
+
+    def test_backfill_due_dates_follow_occurrence_date(self, templates):
+        populate("monthly", "--from", "01/02/2026", "--to", "28/02/2026")
+
+        task = Task.objects.get(template=templates["monthly"])
+        assert task.period_start == date(2026, 2, 1)
+        assert task.run_date == date(2026, 2, 1)
+        # Sun 1 Feb: Mon 2, Tue 3, Wed 4 are the three working days
+        assert task.due_date == date(2026, 2, 4)
+
+    def test_backfill_requires_both_bounds(self, templates):
+        with pytest.raises(CommandError):
+            populate("--from", "01/01/2026")
+        with pytest.raises(CommandError):
+            populate("--from", "01/02/2026", "--to", "01/01/2026")
+
+
+# Each pass closes the connection, which a test transaction would not survive
+@pytest.mark.django_db(transaction=True)
+class TestRunScheduler:
+    @pytest.fixture
+    def templates(self, system_user, it_department):
+        holiday_calendar.invalidate()
+        return {
+            interval: Template.objects.create(
+                task_name=f"{interval} return",
+                department=it_department,
+                recurring_interval=interval,
+                recurring_task_status="Active",
+                type_of_compliance=interval,
+            )
+            for interval in ["daily", "monthly"]
+        }
+
+    def run_once(self):
+        call_command("run_scheduler", "--once", stdout=StringIO())
+
+    def test_first_pass_populates_current_periods(self, templates):
+        self.run_once()
+
+        today = localdate()
+        assert Task.objects.filter(
+            template=templates["daily"], period_start=today
+        ).exists()
+        assert Task.objects.filter(
+            template=templates["monthly"], period_start=today.replace(day=1)
+        ).exists()
+        assert (
+            TaskPopulationRun.objects.get(recurring_interval="daily").last_run_date
+            == today
+        )
+
+    def test_second_pass_is_a_no_op(self, templates):
+        self.run_once()
+        count = Task.objects.count()
+
+        self.run_once()
+        assert Task.objects.count() == count
+
+    def test_missed_runs_are_caught_up(self, templates):
+        today = localdate()
+        TaskPopulationRun.objects.create(
+            recurring_interval="daily", last_run_date=today - timedelta(days=3)
+        )
+
+        self.run_once()
+
+        assert set(
+            Task.objects.filter(template=templates["daily"]).values_list(
+                "period_start", flat=True
+            )
+        ) == {today - timedelta(days=n) for n in range(3)}
+
+    def test_database_outage_fails_the_pass_only(self, templates, monkeypatch):
+        def lost_connection(command):
+            raise OperationalError("server closed the connection unexpectedly")
+
+        monkeypatch.setattr(RunScheduler, "acquire_leadership", lost_connection)
+        stderr = StringIO()
+        call_command("run_scheduler", "--once", stdout=StringIO(), stderr=stderr)
+
+        assert "Scheduling pass failed" in stderr.getvalue()
+        assert not TaskPopulationRun.objects.exists()
@@ -0,0 +1,87 @@
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.http import HttpResponse
+from django.urls import reverse
+
+from compliance.audit import acting_as
+from compliance.middleware import AuditActorMiddleware
+from compliance.models import TaskStatusTransition
+
+backfill_status_transitions = import_module(
+    "compliance.migrations.0014_taskstatustransition"
+).backfill_status_transitions
+
+
+def history(task):
+    return list(
+        task.status_transitions.order_by("timestamp", "id").values_list(
+            "from_status", "to_status", "actor__username"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestTaskStatusTransition:
+    def test_status_changes_are_recorded_with_actor(self, task, officer):
+        with acting_as(officer):
+            task.current_status = "to_be_approved"
+            task.save()
+            task.task_name = "Renamed return"
+            task.save()
+            task.current_status = "review"
+            task.save(update_fields=["current_status"])
+
+        assert history(task) == [
+            (None, "pending", None),
+            ("pending", "to_be_approved", "officer"),
+            ("to_be_approved", "review", "officer"),
+        ]
+
+    def test_actor_ends_with_its_block(self, task, officer):
+        with acting_as(officer):
+            task.current_status = "to_be_approved"
+            task.save()
+        task.current_status = "review"
+        task.save()
+
+        assert history(task)[-1] == ("to_be_approved", "review", None)
+
+    def test_request_user_is_the_actor(self, rf, task, officer):
+        def change_status(request):
+            task.current_status = "to_be_approved"
+            task.save()
+            return HttpResponse()
+
+        request = rf.post("/")
+        request.user = officer
+        AuditActorMiddleware(change_status)(request)
+
+        assert history(task)[-1] == ("pending", "to_be_approved", "officer")
+
+    def test_backfill_copies_auditlog_entries(self, task, officer):
+        with acting_as(officer):
+            task.current_status = "to_be_approved"
+            task.save()
+        expected = history(task)
+        TaskStatusTransition.objects.all().delete()
+
+        backfill_status_transitions(apps, None)
+
+        assert history(task) == expected
+
+    def test_detail_page_shows_history(self, client, task, officer):
+        with acting_as(officer):
+            task.current_status = "to_be_approved"
+            task.save()
+        client.force_login(officer)
+
+        response = client.get(
+            reverse("task_panel", kwargs={"pk": task.pk, "panel": "history"})
+        )
+
+        assert list(response.context["status_transitions"]) == list(
+            task.status_transitions.order_by("-timestamp")
+        )
+        assert "changed status from" in response.content.decode()
@@ -0,0 +1,119 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from compliance.storage import DeduplicatingFileSystemStorage
+
+
+@pytest.fixture
+def storage(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return DeduplicatingFileSystemStorage()
+
+
+def inode(storage, name):
+    return os.stat(storage.path(name)).st_ino
+
+
+class TestDeduplicatingStorage:
+    def test_same_content_is_stored_once(self, storage):
+        first = storage.save("data_document/return.xlsx", ContentFile(b"workbook"))
+        second = storage.save("data_document/return.xlsx", ContentFile(b"workbook"))
+        other = storage.save("data_document/other.xlsx", ContentFile(b"changed"))
+
+        assert first != second
+        assert inode(storage, first) == inode(storage, second)
+        assert inode(storage, other) != inode(storage, first)
+        assert storage.references(first) == 2
+        with storage.open(second) as f:
+            assert f.read() == b"workbook"
+
+    def test_blob_goes_with_last_name(self, storage):
+        first = storage.save("a.pdf", ContentFile(b"circular"))
+        second = storage.save("b.pdf", ContentFile(b"circular"))
+
+        storage.delete(first)
+        assert storage.references(second) == 1
+        storage.delete(second)
+
+        assert list(storage.stored_files()) == []
+        assert storage.prune_blobs(dry_run=True) == 0
+        assert not any(files for _, _, files in os.walk(storage.location))
+
+    def test_large_upload_is_streamed(self, storage):
+        content = os.urandom(300 * 1024)
+        name = storage.save("big.bin", ContentFile(content))
+
+        with storage.open(name) as f:
+            assert f.read() == content
+
+    def test_default_storage(self, storage):
+        assert isinstance(default_storage, DeduplicatingFileSystemStorage)
+
+
+@pytest.mark.django_db
+def test_task_uploads_share_content(storage, make_tasks, it_department):
+    tasks = make_tasks(it_department, "pending", 2)
+    for task in tasks:
+        task.data_document.save("return.xlsx", ContentFile(b"workbook"))
+
+    names = [task.data_document.name for task in tasks]
+    assert names[0] != names[1]
+    assert inode(storage, names[0]) == inode(storage, names[1])
+
+
+class TestDedupeMediaCommand:
+    @pytest.fixture
+    def media(self, storage):
+        # Files written before the storage deduplicated uploads
+        for name, content in [
+            ("circulars_document/a.pdf", b"circular"),
+            ("circulars_document/b.pdf", b"circular"),
+            ("data_document/c.xlsx", b"circular"),
+            ("data_document/d.xlsx", b"workbook"),
+        ]:
+            path = storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+        return storage
+
+    def test_dedupes_in_place(self, media):
+        out = StringIO()
+        call_command("dedupe_media", stdout=out)
+
+        assert "Deduplicated 4 files, freeing 16" in out.getvalue()
+        assert (
+            inode(media, "circulars_document/a.pdf")
+            == inode(media, "circulars_document/b.pdf")
+            == inode(media, "data_document/c.xlsx")
+        )
+        assert media.references("data_document/d.xlsx") == 1
+        with media.open("data_document/c.xlsx") as f:
+            assert f.read() == b"circular"
+
+        # Running it again changes nothing
+        out = StringIO()
+        call_command("dedupe_media", stdout=out)
+        assert "freeing 0" in out.getvalue()
+
+    def test_dry_run(self, media):
+        out = StringIO()
+        call_command("dedupe_media", "--dry-run", stdout=out)
+
+        assert "4 files with 2 distinct contents" in out.getvalue()
+        assert "would free 16" in out.getvalue()
+        assert media.references("circulars_document/a.pdf") == 0
+
+    def test_prune(self, media):
+        call_command("dedupe_media", stdout=StringIO())
+        os.remove(media.path("data_document/d.xlsx"))
+
+        out = StringIO()
+        call_command("dedupe_media", "--prune", stdout=out)
+
+        assert "Removed 1 unreferenced blobs." in out.getvalue()
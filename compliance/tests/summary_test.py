@@ -0,0 +1,249 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate
+
+from compliance.counters import get_task_counts
+from compliance.models import Task, TaskSummary, Template
+from compliance.signals import tasks_bulk_changed
+from compliance.summary import adjust_task_summary, rebuild_task_summary
+from compliance.transitions import apply_transition
+
+
+@pytest.fixture
+def board_template(it_department):
+    return Template.objects.create(
+        task_name="Board return",
+        department=it_department,
+        type_of_compliance="annual",
+        type_of_due_date="board_meeting",
+    )
+
+
+def summary_rows():
+    return set(
+        TaskSummary.objects.values_list(
+            "department_id",
+            "current_status",
+            "type_of_compliance",
+            "due_date",
+            "awaiting_board_meeting",
+            "task_count",
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestTaskSummary:
+    def test_incremental_updates_match_a_rebuild(
+        self, it_department, finance_department, board_template, create_task
+    ):
+        today = localdate()
+        first = create_task(it_department, due_date=today)
+        second = create_task(it_department, due_date=today)
+        create_task(it_department, template=board_template)
+        moved = create_task(it_department, due_date=today - timedelta(days=1))
+
+        second.current_status = "to_be_approved"
+        second.save()
+        moved.department = finance_department
+        moved.save()
+        first.delete()
+
+        incremental = summary_rows()
+        rebuild_task_summary()
+        assert summary_rows() == incremental
+        assert (
+            it_department.id,
+            "pending",
+            "monthly",
+            None,
+            True,
+            1,
+        ) in incremental
+
+    def test_board_meeting_date_clears_awaiting_flag(
+        self, it_department, board_template, create_task
+    ):
+        task = create_task(it_department, template=board_template)
+        assert TaskSummary.objects.get(task_count=1).awaiting_board_meeting
+
+        task.board_meeting_date_flag = True
+        task.save()
+        assert not TaskSummary.objects.get(task_count=1).awaiting_board_meeting
+
+    def test_bulk_change_signal_rebuilds_department(
+        self, it_department, finance_department, create_task
+    ):
+        task = create_task(it_department)
+        create_task(finance_department)
+
+        Task.objects.filter(pk=task.pk).update(current_status="review")
+        tasks_bulk_changed.send(sender=Task, department_ids={it_department.id})
+
+        assert summary_rows() == {
+            (it_department.id, "review", "monthly", None, False, 1),
+            (finance_department.id, "pending", "monthly", None, False, 1),
+        }
+
+    def test_save_does_not_read_the_task_back(self, it_department, create_task):
+        task = create_task(it_department)
+        task.current_status = "to_be_approved"
+
+        with CaptureQueriesContext(connection) as captured:
+            task.save()
+
+        queries = [query["sql"] for query in captured.captured_queries]
+        update = next(
+            i
+            for i, sql in enumerate(queries)
+            if sql.startswith('UPDATE "compliance_task"')
+        )
+        assert not [
+            sql
+            for sql in queries[update:]
+            if sql.startswith("SELECT") and 'FROM "compliance_task" ' in sql
+        ]
+        assert summary_rows() == {
+            (it_department.id, "to_be_approved", "monthly", None, False, 1)
+        }
+
+    def test_save_of_loaded_task_reads_nothing_back(self, it_department, create_task):
+        task = Task.objects.get(pk=create_task(it_department).pk)
+        task.current_status = "to_be_approved"
+
+        with CaptureQueriesContext(connection) as captured:
+            task.save()
+        task.current_status = "review"
+        task.save()
+
+        task_reads = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "compliance_task" ' in query["sql"]
+        ]
+        # Only auditlog's own read of the row it diffs against
+        assert len(task_reads) == 1
+        assert '"compliance_template"' not in task_reads[0]
+        assert summary_rows() == {
+            (it_department.id, "review", "monthly", None, False, 1)
+        }
+
+    def test_refreshed_task_is_counted_from_its_new_state(
+        self, it_department, create_task
+    ):
+        task = create_task(it_department)
+        Task.objects.filter(pk=task.pk).update(current_status="review")
+        tasks_bulk_changed.send(sender=Task, department_ids={it_department.id})
+
+        task.refresh_from_db()
+        task.current_status = "submitted"
+        task.save()
+
+        assert summary_rows() == {
+            (it_department.id, "submitted", "monthly", None, False, 1)
+        }
+
+    def test_rows_are_deleted_when_they_reach_zero(self, it_department, create_task):
+        task = create_task(it_department)
+        task.current_status = "to_be_approved"
+        task.save()
+
+        assert summary_rows() == {
+            (it_department.id, "to_be_approved", "monthly", None, False, 1)
+        }
+
+    def test_template_due_date_type_change_moves_awaiting_tasks(
+        self, it_department, board_template, create_task
+    ):
+        create_task(it_department, template=board_template)
+        create_task(
+            it_department, template=board_template, board_meeting_date_flag=True
+        )
+
+        board_template.type_of_due_date = "calendar"
+        board_template.save()
+        assert summary_rows() == {
+            (it_department.id, "pending", "monthly", None, False, 2)
+        }
+
+        template = Template.objects.get(pk=board_template.pk)
+        template.type_of_due_date = "board_meeting_conditional"
+        template.save()
+        assert summary_rows() == {
+            (it_department.id, "pending", "monthly", None, True, 1),
+            (it_department.id, "pending", "monthly", None, False, 1),
+        }
+
+    def test_bulk_transition_applies_deltas(self, it_department, create_task):
+        today = localdate()
+        waiting = create_task(it_department, current_status="to_be_approved")
+        create_task(it_department, due_date=today)
+        # Drift in a row the transition does not touch survives it
+        TaskSummary.objects.filter(due_date=today).update(task_count=5)
+
+        apply_transition("approve", [waiting.id])
+
+        assert summary_rows() == {
+            (it_department.id, "review", "monthly", None, False, 1),
+            (it_department.id, "pending", "monthly", today, False, 5),
+        }
+
+    @pytest.mark.skipif(
+        not connection.features.supports_nulls_distinct_unique_constraints,
+        reason="needs NULLS NOT DISTINCT unique constraints",
+    )
+    def test_one_row_per_key(self, it_department):
+        key = (it_department.id, "pending", "monthly", None, False)
+        adjust_task_summary(key, 2)
+        adjust_task_summary(key, 1)
+
+        assert TaskSummary.objects.get().task_count == 3
+        with pytest.raises(IntegrityError):
+            TaskSummary.objects.create(
+                department=it_department,
+                current_status="pending",
+                type_of_compliance="monthly",
+                task_count=1,
+            )
+
+    def test_rebuild_command_reconciles_drift(
+        self, it_department, create_task, django_capture_on_commit_callbacks
+    ):
+        create_task(it_department)
+        TaskSummary.objects.update(task_count=5)
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 5
+        )
+
+        out = StringIO()
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("rebuild_task_summary", stdout=out)
+
+        assert "1 row(s) written" in out.getvalue()
+        assert TaskSummary.objects.get().task_count == 1
+        # The counters cached from the drifted summary are dropped
+        assert (
+            get_task_counts(department_id=it_department.id)["pending_tasks_count"] == 1
+        )
+
+    def test_admin_is_read_only(self, admin_client, it_department, create_task):
+        create_task(it_department)
+        summary = TaskSummary.objects.get()
+
+        def status(name, *args, method="get"):
+            url = reverse(f"admin:compliance_tasksummary_{name}", args=args)
+            return getattr(admin_client, method)(url).status_code
+
+        assert status("changelist") == 200
+        assert status("change", summary.pk) == 200
+        assert status("add") == 403
+        assert status("change", summary.pk, method="post") == 403
+        assert status("delete", summary.pk, method="post") == 403
+        assert TaskSummary.objects.get().task_count == 1
@@ -0,0 +1,27 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from compliance.management.commands.benchmark_task_tables import (
+    Command as BenchmarkCommand,
+)
+from compliance.tables import TaskApprovalTable, TaskRowRenderer, TaskTable
+
+
+@pytest.mark.parametrize("table_class", [TaskTable, TaskApprovalTable])
+def test_fast_renderer_matches_django_tables2(table_class):
+    command = BenchmarkCommand()
+    tasks = command.make_tasks(120)
+
+    assert TaskRowRenderer(table_class).rows(tasks) == command.render_generic(
+        table_class, tasks
+    )
+
+
+def test_benchmark_command_reports_speedup():
+    out = StringIO()
+
+    call_command("benchmark_task_tables", "--rows", "300", stdout=out)
+
+    assert "TaskRowRenderer" in out.getvalue()
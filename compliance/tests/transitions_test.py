@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+from django.utils.timezone import localdate
+
+from auditlog.models import LogEntry
+
+from compliance.models import Task, TaskStatusTransition, TaskSummary
+from compliance.transitions import (
+    APPLIED,
+    INVALID_STATUS,
+    NOT_FOUND,
+    apply_transition,
+)
+
+
+@pytest.mark.django_db
+class TestApplyTransition:
+    def test_approve_moves_eligible_tasks_in_one_update(
+        self, it_department, officer, django_assert_max_num_queries, make_tasks
+    ):
+        tasks = make_tasks(it_department, "to_be_approved", 20)
+
+        with django_assert_max_num_queries(13):
+            outcomes = apply_transition(
+                "approve", [task.id for task in tasks], actor=officer
+            )
+
+        assert set(outcomes.values()) == {APPLIED}
+        assert set(
+            Task.objects.values_list("current_status", "date_of_document_received")
+        ) == {("review", localdate())}
+
+    def test_outcomes_per_task(self, it_department, officer, make_tasks):
+        (waiting,) = make_tasks(it_department, "to_be_approved", 1)
+        (pending,) = make_tasks(it_department, "pending", 1)
+
+        outcomes = apply_transition(
+            "send_back", [waiting.id, pending.id, 999999], actor=officer
+        )
+
+        assert outcomes == {
+            waiting.id: APPLIED,
+            pending.id: INVALID_STATUS,
+            999999: NOT_FOUND,
+        }
+        pending.refresh_from_db()
+        assert pending.current_status == "pending"
+
+    def test_queryset_limits_scope(
+        self, it_department, finance_department, officer, make_tasks
+    ):
+        (task,) = make_tasks(finance_department, "review", 1)
+
+        outcomes = apply_transition(
+            "submit",
+            [task.id],
+            queryset=Task.objects.filter(department=it_department),
+            actor=officer,
+        )
+
+        assert outcomes == {task.id: NOT_FOUND}
+
+    def test_audit_and_history_rows(self, it_department, officer, make_tasks):
+        tasks = make_tasks(it_department, "review", 2)
+        Task.objects.update(date_of_document_received=localdate())
+
+        apply_transition("revise", [task.id for task in tasks], actor=officer)
+
+        for task in tasks:
+            entry = LogEntry.objects.get_for_object(task).latest("id")
+            assert entry.actor == officer
+            assert entry.changes == {
+                "current_status": ["review", "revision"],
+                "date_of_document_received": [str(localdate()), "None"],
+            }
+        assert set(
+            TaskStatusTransition.objects.filter(to_status="revision").values_list(
+                "task_id", "from_status", "actor_id"
+            )
+        ) == {(task.id, "review", officer.id) for task in tasks}
+
+    def test_summary_follows_bulk_transition(self, it_department, officer, make_tasks):
+        tasks = make_tasks(it_department, "to_be_approved", 3)
+
+        apply_transition("approve", [task.id for task in tasks], actor=officer)
+
+        assert dict(
+            TaskSummary.objects.filter(task_count__gt=0).values_list(
+                "current_status", "task_count"
+            )
+        ) == {"review": 3}
+
+
+@pytest.mark.django_db
+def test_approval_list_post_reports_skipped(client, it_department, officer, make_tasks):
+    waiting = make_tasks(it_department, "to_be_approved", 2)
+    (pending,) = make_tasks(it_department, "pending", 1)
+    client.force_login(officer)
+
+    response = client.post(
+        reverse("task_list_approval_pending"),
+        {"select": [task.id for task in waiting] + [pending.id], "action": "approve"},
+        follow=True,
+    )
+
+    notes = [str(message) for message in response.context["messages"]]
+    assert "2 task(s) approved and moved to Review." in notes
+    assert "1 task(s) skipped as they are no longer awaiting approval." in notes
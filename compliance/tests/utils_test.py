@@ -0,0 +1,415 @@
+import random
+from contextlib import suppress
+from datetime import date, timedelta
+
+import pytest
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, transaction
+from django.utils.timezone import localdate
+
+from compliance.models import PublicHoliday, Task, Template
+from compliance.utils import (
+    HolidayCalendar,
+    calculate_due_date,
+    calculate_due_dates,
+    holiday_calendar,
+    is_working_day,
+    recompute_working_due_dates,
+    set_board_meeting_dates,
+)
+
+
+@pytest.fixture
+def fresh_calendar(db):
+    """Make sure no holidays from an earlier, rolled back test are cached."""
+    holiday_calendar.invalidate()
+    yield holiday_calendar
+    holiday_calendar.invalidate()
+
+
+@pytest.mark.django_db
+class TestHolidayCalendar:
+    def test_weekends_are_not_working_days(self, fresh_calendar):
+        assert is_working_day(date(2026, 3, 6)) is True  # Friday
+        assert is_working_day(date(2026, 3, 7)) is False  # Saturday
+        assert is_working_day(date(2026, 3, 8)) is False  # Sunday
+
+    def test_public_holiday_is_not_a_working_day(self, fresh_calendar):
+        PublicHoliday.objects.create(
+            date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+        )
+        assert is_working_day(date(2026, 3, 4)) is False
+
+    def test_calendar_is_loaded_once(
+        self,
+        fresh_calendar,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            PublicHoliday.objects.create(
+                date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+            )
+        with django_assert_num_queries(1):
+            for _ in range(5):
+                calculate_due_date(
+                    due_date_days=20, type_of_due_date="working", run_date="02/03/2026"
+                )
+
+    def test_other_processes_reload_after_commit(
+        self, fresh_calendar, django_capture_on_commit_callbacks
+    ):
+        # Another worker or the scheduler, holding its own copy
+        other = HolidayCalendar()
+        assert other.is_working_day(date(2026, 3, 4)) is True
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            PublicHoliday.objects.create(
+                date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+            )
+        # Not committed yet: only the changing process sees the holiday
+        assert other.is_working_day(date(2026, 3, 4)) is True
+        assert is_working_day(date(2026, 3, 4)) is False
+
+        for callback in callbacks:
+            callback()
+        assert other.is_working_day(date(2026, 3, 4)) is False
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rolled_back_change_is_not_kept(self, django_assert_num_queries):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                PublicHoliday.objects.create(
+                    date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+                )
+                assert is_working_day(date(2026, 3, 4)) is False
+                raise RuntimeError
+
+        assert is_working_day(date(2026, 3, 4)) is True
+        # Cached again, instead of reloading for the rest of the process
+        with django_assert_num_queries(0):
+            assert is_working_day(date(2026, 3, 4)) is True
+
+    def test_holiday_save_invalidates_calendar(self, fresh_calendar):
+        assert is_working_day(date(2026, 3, 4)) is True
+
+        holiday = PublicHoliday.objects.create(
+            date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+        )
+        assert is_working_day(date(2026, 3, 4)) is False
+
+        holiday.delete()
+        assert is_working_day(date(2026, 3, 4)) is True
+
+    def test_add_working_days_skips_weekends_and_holidays(self, fresh_calendar):
+        PublicHoliday.objects.create(
+            date_of_holiday=date(2026, 3, 4), name_of_holiday="Holi"
+        )
+        # Mon 2 Mar counts as day 1, Wed 4 Mar is a holiday
+        assert calculate_due_date(
+            due_date_days=3, type_of_due_date="working", run_date="02/03/2026"
+        ) == date(2026, 3, 5)
+        # Sat 7 Mar is skipped, Mon 9 Mar counts as day 1
+        assert calculate_due_date(
+            due_date_days=1, type_of_due_date="working", run_date="07/03/2026"
+        ) == date(2026, 3, 9)
+
+
+def reference_working_due_date(start_date, due_date_days, holidays):
+    """The original day-by-day walk, kept as the oracle for the parity tests."""
+
+    def working(day):
+        return day.weekday() < 5 and day not in holidays
+
+    current_date = start_date
+    days_added = 1 if working(current_date) else 0
+    while days_added < due_date_days:
+        current_date += timedelta(days=1)
+        if working(current_date):
+            days_added += 1
+    return current_date
+
+
+@pytest.fixture
+def random_holidays(fresh_calendar):
+    """Roughly two holidays a month over 2024-2027, including some weekends."""
+    rng = random.Random(20260301)
+    start = date(2024, 1, 1)
+    dates = {start + timedelta(days=rng.randrange(4 * 365)) for _ in range(100)}
+    PublicHoliday.objects.bulk_create(
+        PublicHoliday(date_of_holiday=d, name_of_holiday=f"Holiday {d}") for d in dates
+    )
+    fresh_calendar.invalidate()
+    return dates
+
+
+@pytest.mark.django_db
+class TestWorkingDayParity:
+    OFFSETS = [1, 2, 3, 5, 7, 10, 15, 20, 30, 45]
+
+    def test_bulk_matches_reference_over_several_years(self, random_holidays):
+        start_dates = [date(2024, 1, 1) + timedelta(days=n) for n in range(3 * 365 + 1)]
+        for offset in self.OFFSETS:
+            due_dates = calculate_due_dates(start_dates, offset, "working")
+            expected = [
+                reference_working_due_date(start, offset, random_holidays)
+                for start in start_dates
+            ]
+            assert due_dates == expected, f"mismatch for {offset} working days"
+
+    def test_scalar_matches_bulk(self, random_holidays):
+        rng = random.Random(7)
+        start_dates = [
+            date(2024, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+            for _ in range(200)
+        ]
+        offsets = [rng.choice(self.OFFSETS) for _ in start_dates]
+
+        bulk = calculate_due_dates(start_dates, offsets, "working")
+        scalar = [
+            calculate_due_date(
+                due_date_days=offset,
+                type_of_due_date="working",
+                run_date=start.strftime("%d/%m/%Y"),
+            )
+            for start, offset in zip(start_dates, offsets)
+        ]
+        assert bulk == scalar
+
+    def test_mixed_due_date_types(self, random_holidays):
+        run_date = date(2026, 3, 6)
+        due_dates = calculate_due_dates(
+            run_date,
+            [10, 10, 10, 10, 10],
+            ["calendar", "working", "board_meeting_conditional", "board_meeting", "x"],
+        )
+        assert due_dates == [
+            run_date + timedelta(days=9),
+            reference_working_due_date(run_date, 10, random_holidays),
+            run_date + timedelta(days=9),
+            run_date + timedelta(days=10),
+            None,
+        ]
+
+
+@pytest.fixture
+def working_day_task(fresh_calendar, it_department):
+    template = Template.objects.create(
+        task_name="Working day return",
+        department=it_department,
+        type_of_due_date="working",
+        due_date_days=10,
+    )
+    return Task.objects.create(
+        task_name="Working day return",
+        department=it_department,
+        template=template,
+        current_status="pending",
+        due_date=holiday_calendar.add_working_days(localdate(), 10),
+    )
+
+
+def next_working_day_after(day):
+    day += timedelta(days=1)
+    while not is_working_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+@pytest.mark.django_db
+class TestRecomputeWorkingDueDates:
+    @pytest.fixture
+    def committed(self, django_capture_on_commit_callbacks):
+        return lambda: django_capture_on_commit_callbacks(execute=True)
+
+    def task_log_entries(self):
+        return LogEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task), object_pk=""
+        )
+
+    def test_new_holiday_inside_window_pushes_due_date(
+        self, working_day_task, committed
+    ):
+        holiday = next_working_day_after(localdate())
+        expected = next_working_day_after(working_day_task.due_date)
+
+        with committed():
+            PublicHoliday.objects.create(
+                date_of_holiday=holiday, name_of_holiday="Late"
+            )
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == expected
+        assert self.task_log_entries().count() == 1
+
+    def test_removing_holiday_pulls_due_date_back(self, working_day_task, committed):
+        original_due_date = working_day_task.due_date
+        with committed():
+            holiday = PublicHoliday.objects.create(
+                date_of_holiday=next_working_day_after(localdate()),
+                name_of_holiday="Late",
+            )
+        with committed():
+            holiday.delete()
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == original_due_date
+
+    def test_holiday_outside_window_is_ignored(self, working_day_task, committed):
+        original_due_date = working_day_task.due_date
+        with committed():
+            PublicHoliday.objects.create(
+                date_of_holiday=next_working_day_after(original_due_date),
+                name_of_holiday="After due date",
+            )
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == original_due_date
+        assert not self.task_log_entries().exists()
+
+    def test_backfilled_task_counts_from_its_run_date(
+        self, working_day_task, committed
+    ):
+        # Generated today for a run date two months back, as a backfill does
+        run_date = localdate().replace(day=1) - timedelta(days=45)
+        task = Task.objects.create(
+            task_name="Backfilled return",
+            department=working_day_task.department,
+            template=working_day_task.template,
+            current_status="pending",
+            run_date=run_date,
+            due_date=holiday_calendar.add_working_days(run_date, 10),
+        )
+        holiday = next_working_day_after(run_date)
+        expected = next_working_day_after(task.due_date)
+
+        with committed():
+            PublicHoliday.objects.create(
+                date_of_holiday=holiday, name_of_holiday="Late"
+            )
+
+        task.refresh_from_db()
+        assert task.due_date == expected
+
+    def test_transaction_is_recomputed_once(self, working_day_task, committed):
+        original_due_date = working_day_task.due_date
+        first = next_working_day_after(localdate())
+        second = next_working_day_after(first)
+
+        with committed():
+            PublicHoliday.objects.create(date_of_holiday=first, name_of_holiday="A")
+            PublicHoliday.objects.create(date_of_holiday=second, name_of_holiday="B")
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == next_working_day_after(
+            next_working_day_after(original_due_date)
+        )
+        assert self.task_log_entries().count() == 1
+
+        with committed():
+            PublicHoliday.objects.all().delete()
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == original_due_date
+        assert self.task_log_entries().count() == 2
+
+    def test_rolled_back_savepoint_keeps_the_rest(self, working_day_task, committed):
+        expected = next_working_day_after(working_day_task.due_date)
+
+        with committed():
+            with suppress(DatabaseError), transaction.atomic():
+                PublicHoliday.objects.create(
+                    date_of_holiday=next_working_day_after(localdate()),
+                    name_of_holiday="Rolled back",
+                )
+                raise DatabaseError
+            PublicHoliday.objects.create(
+                date_of_holiday=next_working_day_after(localdate()),
+                name_of_holiday="Late",
+            )
+
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == expected
+
+    def test_non_pending_tasks_are_left_alone(self, working_day_task):
+        working_day_task.current_status = "submitted"
+        working_day_task.save()
+        original_due_date = working_day_task.due_date
+
+        holiday = next_working_day_after(localdate())
+        PublicHoliday.objects.bulk_create(
+            [PublicHoliday(date_of_holiday=holiday, name_of_holiday="Late")]
+        )
+        holiday_calendar.invalidate()
+
+        assert recompute_working_due_dates([holiday]) == 0
+        working_day_task.refresh_from_db()
+        assert working_day_task.due_date == original_due_date
+
+
+@pytest.mark.django_db
+class TestSetBoardMeetingDates:
+    def make_task(self, department, **template_fields):
+        template = Template.objects.create(
+            task_name="Board return", department=department, **template_fields
+        )
+        return Task.objects.create(
+            task_name="Board return",
+            department=department,
+            template=template,
+            due_date=date(2026, 6, 30),
+        )
+
+    def test_plain_and_conditional_due_dates(self, it_department):
+        plain = self.make_task(
+            it_department, type_of_due_date="board_meeting", due_date_days=7
+        )
+        earlier, later = (
+            self.make_task(
+                it_department,
+                type_of_due_date="board_meeting_conditional",
+                alternate_due_date_days=30,
+                conditional_operator=operator,
+            )
+            for operator in ["earlier", "later"]
+        )
+
+        updated = set_board_meeting_dates(
+            [plain.id, earlier.id, later.id], date(2026, 5, 1)
+        )
+
+        assert updated == 3
+        for task in (plain, earlier, later):
+            task.refresh_from_db()
+            assert task.board_meeting_date == date(2026, 5, 1)
+            assert task.board_meeting_date_flag is True
+        assert plain.due_date == date(2026, 5, 8)
+        assert earlier.due_date == date(2026, 5, 31)
+        assert later.due_date == date(2026, 6, 30)
+
+    def test_counts_only_tasks_still_waiting(self, it_department):
+        tasks = [
+            self.make_task(it_department, type_of_due_date="board_meeting")
+            for _ in range(3)
+        ]
+        Task.objects.filter(id=tasks[0].id).update(board_meeting_date_flag=True)
+        calendar_task = self.make_task(it_department, type_of_due_date="calendar")
+
+        ids = [task.id for task in tasks] + [calendar_task.id]
+        assert set_board_meeting_dates(ids, date(2026, 5, 1)) == 2
+        assert set_board_meeting_dates(ids, date(2026, 5, 1)) == 0
+
+    def test_queries_do_not_grow_with_tasks(
+        self, it_department, django_assert_max_num_queries
+    ):
+        tasks = [
+            self.make_task(it_department, type_of_due_date="board_meeting")
+            for _ in range(30)
+        ]
+
+        with django_assert_max_num_queries(12):
+            set_board_meeting_dates([task.id for task in tasks], date(2026, 5, 1))
+
+        entry = LogEntry.objects.get_for_object(tasks[0]).latest("id")
+        assert entry.changes["board_meeting_date_flag"] == ["False", "True"]
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.timezone import localdate
+
+from .audit import current_actor, log_bulk_updates, record_status_transitions
+from .models import Task
+from .signals import tasks_bulk_changed
+from .summary import summary_counts, summary_deltas
+
+# Outcome of each requested task id
+APPLIED = "applied"
+NOT_FOUND = "not_found"
+INVALID_STATUS = "invalid_status"
+
+
+@dataclass(frozen=True)
+class Transition:
+    from_statuses: frozenset
+    to_status: str
+    # Task date fields set to today (True) or cleared (None) on the way
+    dates: dict = field(default_factory=dict)
+
+
+TRANSITIONS = {
+    "approve": Transition(
+        frozenset({"to_be_approved"}),
+        "review",
+        {"date_of_document_received": True},
+    ),
+    "send_back": Transition(frozenset({"to_be_approved"}), "pending"),
+    "revise": Transition(
+        frozenset(Task.REVIEWABLE_STATUSES),
+        "revision",
+        {"date_of_document_received": None, "date_of_document_forwarded": None},
+    ),
+    "submit": Transition(
+        frozenset({"review"}),
+        "submitted",
+        {"date_of_document_forwarded": True},
+    ),
+}
+
+
+def apply_transition(action, task_ids, queryset=None, actor=None):
+    """
+    Move every task in `task_ids` that is in one of the action's allowed
+    statuses to its target status with a single UPDATE, then write their
+    audit log entries and status history with bulk_create.
+
+    `queryset` limits which tasks may be touched (e.g. to the user's
+    department); tasks outside it are reported as not found. Returns a
+    dict mapping each requested task id to APPLIED, NOT_FOUND or
+    INVALID_STATUS.
+    """
+    transition = TRANSITIONS[action]
+    task_ids = {int(task_id) for task_id in task_ids}
+    queryset = Task.objects.all() if queryset is None else queryset
+    actor = actor or current_actor()
+
+    outcomes = dict.fromkeys(task_ids, NOT_FOUND)
+    with transaction.atomic():
+        # Locked so the statuses read here are the ones the UPDATE replaces
+        rows = (
+            queryset.filter(id__in=task_ids)
+            .select_for_update()
+            .order_by()
+            .values(
+                "id", "current_status", "department_id", "task_name", *transition.dates
+            )
+        )
+        eligible = {}
+        for row in rows:
+            if row["current_status"] in transition.from_statuses:
+                eligible[row["id"]] = row
+                outcomes[row["id"]] = APPLIED
+            else:
+                outcomes[row["id"]] = INVALID_STATUS
+
+        if not eligible:
+            return outcomes
+
+        changed = Task.objects.filter(id__in=eligible)
+        before = summary_counts(changed)
+        today = localdate()
+        values = {
+            name: today if set_today else None
+            for name, set_today in transition.dates.items()
+        }
+        Task.objects.filter(
+            id__in=eligible, current_status__in=transition.from_statuses
+        ).update(
+            current_status=transition.to_status,
+            updated_on=timezone.now(),
+            **values,
+        )
+
+        values["current_status"] = transition.to_status
+        log_bulk_updates(
+            Task,
+            {
+                task_id: (
+                    row["task_name"],
+                    {
+                        name: [row[name], value]
+                        for name, value in values.items()
+                        if row[name] != value
+                    },
+                )
+                for task_id, row in eligible.items()
+            },
+            actor=actor,
+        )
+        record_status_transitions(
+            {task_id: row["current_status"] for task_id, row in eligible.items()},
+            transition.to_status,
+            actor=actor,
+        )
+        deltas = summary_deltas(before, summary_counts(changed))
+
+    tasks_bulk_changed.send(
+        sender=Task,
+        department_ids={row["department_id"] for row in eligible.values()},
+        summary_deltas=deltas,
+    )
+    return outcomes
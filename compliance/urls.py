@@ -39,6 +39,26 @@ urlpatterns = [
         views.TaskDetailView.as_view(),
         name="task_detail",
     ),
+    path(
+        "tasks/<int:pk>/panels/<str:panel>/",
+        views.task_panel,
+        name="task_panel",
+    ),
+    path(
+        "tasks/<int:pk>/documents/<str:field>/",
+        views.task_document,
+        name="task_document",
+    ),
+    path(
+        "templates/<int:pk>/documents/<str:field>/",
+        views.template_document,
+        name="template_document",
+    ),
+    path(
+        "tasks/<int:pk>/audit/",
+        views.task_audit_history,
+        name="task_audit_history",
+    ),
     path(
         "tasks/approval/pending/",
         views.TaskApprovalPendingListView.as_view(),
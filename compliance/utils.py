@@ -1,10 +1,141 @@
+import threading
+import uuid
+from bisect import bisect_left
 from datetime import datetime, timedelta
 
+import numpy as np
+from dateutil.relativedelta import relativedelta
 
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
 from django.utils.timezone import localdate
 
 
-from .models import PublicHoliday
+from .audit import log_bulk_summary, log_bulk_updates
+from .models import PublicHoliday, Task
+from .summary import summary_counts, summary_deltas
+
+
+HOLIDAY_CALENDAR_VERSION_KEY = "compliance:holiday_calendar:version"
+
+# Added to a period start, lands in the next period. Fortnights are the
+# halves of a month (1st-15th and 16th-end), as fortnightly returns are run
+# on the 1st and the 16th, so 16 days always reach the next half.
+PERIOD_STEPS = {
+    "daily": relativedelta(days=1),
+    "weekly": relativedelta(weeks=1),
+    "fortnightly": relativedelta(days=16),
+    "monthly": relativedelta(months=1),
+    "quarterly": relativedelta(months=3),
+    "halfyearly": relativedelta(months=6),
+    "annual": relativedelta(months=1),
+}
+
+
+class HolidayCalendar:
+    """
+    Process-wide, in-memory view of the PublicHoliday table.
+
+    Holiday dates are loaded with a single query and reused for as long as
+    the version token in the shared cache (settings.CACHES) is unchanged.
+    `invalidate` replaces the token once the change commits, so every
+    worker and the scheduler process reload on their next use. Until then
+    the changing transaction reads its own holidays afresh on every use
+    without keeping them, so a rollback leaves nothing stale behind.
+    """
+
+    # weekday(): 0 = Monday, 6 = Sunday
+    WEEKMASK = "1111100"
+
+    def __init__(self):
+        self._holidays = None
+        self._busdaycalendar = None
+        self._version = None
+        # Per thread, like database connections: whether this thread's open
+        # transaction has changed holidays
+        self._pending = threading.local()
+
+    def _current_version(self):
+        return cache.get_or_set(
+            HOLIDAY_CALENDAR_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None
+        )
+
+    def _in_changing_transaction(self):
+        if not getattr(self._pending, "changed", False):
+            return False
+        if transaction.get_connection().in_atomic_block:
+            return True
+        # The transaction has ended: committed and published, or rolled back
+        self._pending.changed = False
+        return False
+
+    def _read(self):
+        holidays = sorted(
+            PublicHoliday.objects.values_list("date_of_holiday", flat=True)
+        )
+        return frozenset(holidays), np.busdaycalendar(
+            weekmask=self.WEEKMASK,
+            holidays=np.array(holidays, dtype="datetime64[D]"),
+        )
+
+    def _load(self):
+        if self._in_changing_transaction():
+            return self._read()
+        version = self._current_version()
+        if self._holidays is None or self._version != version:
+            self._holidays, self._busdaycalendar = self._read()
+            self._version = version
+        return self._holidays, self._busdaycalendar
+
+    @property
+    def holidays(self) -> frozenset:
+        return self._load()[0]
+
+    @property
+    def busdaycalendar(self) -> np.busdaycalendar:
+        return self._load()[1]
+
+    def invalidate(self):
+        self._pending.changed = True
+        transaction.on_commit(self._publish)
+
+    def _publish(self):
+        self._pending.changed = False
+        cache.set(HOLIDAY_CALENDAR_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+    def is_working_day(self, date) -> bool:
+        return date.weekday() < 5 and date not in self.holidays
+
+    def add_working_days_bulk(self, start_dates, days):
+        """
+        Vectorised `add_working_days`: takes arrays of start dates and day
+        counts and returns a datetime64[D] array of due dates.
+        """
+        starts, days = np.broadcast_arrays(
+            np.asarray(start_dates, dtype="datetime64[D]"),
+            np.asarray(days, dtype=np.int64),
+        )
+        # Rolling forward makes the first working day on or after the start
+        # "day 1", so only days - 1 further working days need to be added.
+        due_dates = np.busday_offset(
+            starts,
+            np.maximum(days - 1, 0),
+            roll="forward",
+            busdaycal=self.busdaycalendar,
+        )
+        return np.where(days < 1, starts, due_dates)
+
+    def add_working_days(self, start_date, days):
+        """
+        Return the date on which `days` working days have elapsed, counting
+        `start_date` itself if it is a working day.
+        """
+        return self.add_working_days_bulk([start_date], [days])[0].item()
+
+
+holiday_calendar = HolidayCalendar()
 
 
 def calculate_due_date(
@@ -15,22 +146,83 @@ def calculate_due_date(
     if type_of_due_date == "board_meeting":
         if not meeting_date:
             raise ValueError("meeting_date is required for board_meeting")
-        return meeting_date + timedelta(days=due_date_days)
-    if run_date:
+        start_date = meeting_date
+    elif run_date:
         start_date = datetime.strptime(run_date, "%d/%m/%Y").date()
     else:
         start_date = localdate()
 
-    if type_of_due_date in ["calendar", "board_meeting_conditional"]:
-        return start_date + timedelta(days=due_date_days - 1)
-    elif type_of_due_date == "working":
-        current_date = start_date
-        days_added = 1 if is_working_day(current_date) else 0
-        while days_added < due_date_days:
-            current_date += timedelta(days=1)
-            if is_working_day(current_date):
-                days_added += 1
-        return current_date
+    return calculate_due_dates([start_date], [due_date_days], [type_of_due_date])[0]
+
+
+def calculate_due_dates(start_dates, due_date_days, types_of_due_date):
+    """
+    Vectorised counterpart of `calculate_due_date`.
+
+    Each argument is a sequence (or a scalar broadcast over the others) of
+    run dates (meeting dates for board_meeting), due date days and due date
+    types. Returns a list of dates, with None for types that have no
+    computable due date.
+    """
+    starts, days, types = np.broadcast_arrays(
+        np.asarray(start_dates, dtype="datetime64[D]"),
+        np.asarray(due_date_days, dtype=np.int64),
+        np.asarray(types_of_due_date, dtype=object),
+    )
+    due_dates = np.full(starts.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    calendar = (types == "calendar") | (types == "board_meeting_conditional")
+    due_dates[calendar] = starts[calendar] + (days[calendar] - 1)
+
+    board_meeting = types == "board_meeting"
+    due_dates[board_meeting] = starts[board_meeting] + days[board_meeting]
+
+    working = types == "working"
+    if working.any():
+        due_dates[working] = holiday_calendar.add_working_days_bulk(
+            starts[working], days[working]
+        )
+
+    return [None if np.isnat(d) else d.item() for d in due_dates]
+
+
+def compliance_period_start(recurring_interval, run_date):
+    """
+    First day of the `recurring_interval` compliance period containing
+    `run_date`. Annual templates are issued once per repeat month, so their
+    period is the month.
+    """
+    if recurring_interval == "daily":
+        return run_date
+    if recurring_interval == "weekly":
+        return run_date - timedelta(days=run_date.weekday())
+    if recurring_interval == "fortnightly":
+        return run_date.replace(day=1 if run_date.day < 16 else 16)
+    if recurring_interval in ("monthly", "annual"):
+        return run_date.replace(day=1)
+    if recurring_interval == "quarterly":
+        return run_date.replace(month=(run_date.month - 1) // 3 * 3 + 1, day=1)
+    if recurring_interval == "halfyearly":
+        return run_date.replace(month=1 if run_date.month < 7 else 7, day=1)
+    raise ValueError(f"Unknown recurring interval: {recurring_interval}")
+
+
+def compliance_period_starts(recurring_interval, start_date, end_date):
+    """All `recurring_interval` period start dates between the two dates."""
+    step = PERIOD_STEPS[recurring_interval]
+
+    def next_period_start(period_start):
+        return compliance_period_start(recurring_interval, period_start + step)
+
+    period_start = compliance_period_start(recurring_interval, start_date)
+    if period_start < start_date:
+        period_start = next_period_start(period_start)
+
+    period_starts = []
+    while period_start <= end_date:
+        period_starts.append(period_start)
+        period_start = next_period_start(period_start)
+    return period_starts
 
 
 def calculate_conditional_board_meeting_due_date(task):
@@ -45,6 +237,9 @@ def calculate_conditional_board_meeting_due_date(task):
         days=template.alternate_due_date_days
     )
 
+    if primary is None:
+        return alternate
+
     if template.conditional_operator == "earlier":
         return min(primary, alternate)
 
@@ -55,11 +250,171 @@ def calculate_conditional_board_meeting_due_date(task):
 
 
 def is_working_day(date):
-    # weekday(): 0 = Monday, 6 = Sunday
-    if date.weekday() >= 5:  # Saturday or Sunday
-        return False
+    return holiday_calendar.is_working_day(date)
 
-    if PublicHoliday.objects.filter(date_of_holiday=date).exists():
-        return False
 
-    return True
+def recompute_working_due_dates(changed_dates, batch_size=500):
+    """
+    Recompute the due date of pending working-day tasks after the holiday
+    calendar changed on `changed_dates`.
+
+    Only tasks whose run-date-to-due window contains one of the changed
+    dates can be affected. The run date is the date the due date was
+    counted from (a backfilled or --run-date task's occurrence date, not
+    its creation); tasks without one, created by hand or before run dates
+    were recorded, fall back to their creation date. They are recomputed
+    in one vectorised pass, written back with bulk_update and recorded as
+    a single audit summary. Returns the number of tasks whose due date
+    moved.
+    """
+    changed_dates = sorted(set(changed_dates))
+    if not changed_dates:
+        return 0
+
+    candidates = (
+        Task.objects.annotate(start_date=Coalesce("run_date", TruncDate("created_on")))
+        .filter(
+            current_status="pending",
+            template__type_of_due_date="working",
+            due_date__gte=changed_dates[0],
+            start_date__lte=changed_dates[-1],
+        )
+        .values_list(
+            "id", "department_id", "due_date", "start_date", "template__due_date_days"
+        )
+    )
+
+    affected = []
+    for task_id, department_id, due_date, start_date, due_date_days in candidates:
+        i = bisect_left(changed_dates, start_date)
+        if i < len(changed_dates) and changed_dates[i] <= due_date:
+            affected.append(
+                (task_id, department_id, due_date, start_date, due_date_days)
+            )
+
+    if not affected:
+        return 0
+
+    task_ids, department_ids, old_due_dates, start_dates, due_date_days = zip(*affected)
+    new_due_dates = calculate_due_dates(start_dates, due_date_days, "working")
+
+    now = timezone.now()
+    updated_tasks = [
+        Task(id=task_id, department_id=department_id, due_date=new, updated_on=now)
+        for task_id, department_id, old, new in zip(
+            task_ids, department_ids, old_due_dates, new_due_dates
+        )
+        if old != new
+    ]
+    if not updated_tasks:
+        return 0
+
+    # Imported here: signals imports this module at load time
+    from .signals import tasks_bulk_changed
+
+    changed = Task.objects.filter(id__in=[task.id for task in updated_tasks])
+    with transaction.atomic():
+        before = summary_counts(changed)
+        Task.objects.bulk_update(
+            updated_tasks, ["due_date", "updated_on"], batch_size=batch_size
+        )
+        log_bulk_summary(
+            Task,
+            f"Recomputed due date of {len(updated_tasks)} working-day task(s) "
+            "after a holiday calendar change",
+            holiday_dates=[d.isoformat() for d in changed_dates],
+            task_ids=[task.id for task in updated_tasks],
+        )
+        deltas = summary_deltas(before, summary_counts(changed))
+
+    tasks_bulk_changed.send(
+        sender=Task,
+        department_ids={task.department_id for task in updated_tasks},
+        summary_deltas=deltas,
+    )
+
+    return len(updated_tasks)
+
+
+def set_board_meeting_dates(task_ids, board_date, batch_size=500):
+    """
+    Record `board_date` as the board meeting date of the given board
+    meeting tasks that are still waiting for one, and derive their due
+    dates: plain board meeting tasks in one vectorised pass, conditional
+    ones from their existing due date and the template's alternate.
+
+    Tasks are fetched with their templates in one query, written back with
+    bulk_update and audited with one LogEntry each. Returns the number of
+    tasks updated.
+    """
+    tasks = list(
+        Task.objects.filter(
+            id__in=task_ids,
+            template__type_of_due_date__in=[
+                "board_meeting",
+                "board_meeting_conditional",
+            ],
+            board_meeting_date_flag=False,
+        )
+        .select_related("template")
+        .only(
+            "task_name",
+            "department_id",
+            "due_date",
+            "board_meeting_date",
+            "template__type_of_due_date",
+            "template__due_date_days",
+            "template__alternate_due_date_days",
+            "template__conditional_operator",
+        )
+    )
+    if not tasks:
+        return 0
+
+    plain = [t for t in tasks if t.template.type_of_due_date == "board_meeting"]
+    plain_due_dates = calculate_due_dates(
+        board_date, [task.template.due_date_days for task in plain], "board_meeting"
+    )
+    new_due_dates = {task.id: due for task, due in zip(plain, plain_due_dates)}
+
+    changes = {}
+    now = timezone.now()
+    for task in tasks:
+        old = (task.board_meeting_date, task.due_date)
+        task.board_meeting_date = board_date
+        if task.id in new_due_dates:
+            task.due_date = new_due_dates[task.id]
+        else:
+            task.due_date = calculate_conditional_board_meeting_due_date(task)
+        task.board_meeting_date_flag = True
+        task.updated_on = now
+        changes[task.id] = (
+            task.task_name,
+            {
+                "board_meeting_date": [old[0], task.board_meeting_date],
+                "due_date": [old[1], task.due_date],
+                "board_meeting_date_flag": [False, True],
+            },
+        )
+
+    # Imported here: signals imports this module at load time
+    from .signals import tasks_bulk_changed
+
+    changed = Task.objects.filter(id__in=[task.id for task in tasks])
+    with transaction.atomic():
+        before = summary_counts(changed)
+        Task.objects.bulk_update(
+            tasks,
+            ["board_meeting_date", "due_date", "board_meeting_date_flag", "updated_on"],
+            batch_size=batch_size,
+        )
+        log_bulk_updates(Task, changes)
+        deltas = summary_deltas(before, summary_counts(changed))
+
+    tasks_bulk_changed.send(
+        sender=Task,
+        department_ids={task.department_id for task in tasks},
+        summary_deltas=deltas,
+    )
+
+    return len(tasks)
@@ -1,3 +1,5 @@
+import hashlib
+
 import pandas as pd
 
 from django.shortcuts import render, redirect, get_object_or_404
@@ -6,17 +8,19 @@ from django.views.generic import DetailView, CreateView
 from django.views.generic.edit import UpdateView
 from django.utils.timezone import localdate
 from django.urls import reverse_lazy, reverse
-from django.http import HttpResponseForbidden
-from django.db.models import Prefetch, Q
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.db.models import Count, Max, Prefetch, Q
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.contrib import messages
-from django.contrib.contenttypes.models import ContentType
+from django.middleware.csrf import get_token
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 
-from auditlog.models import LogEntry
-from auditlog.context import set_actor
 from django_tables2 import RequestConfig
-from django_tables2.views import SingleTableView
+from django_tables2.views import SingleTableMixin, SingleTableView
 
 from .models import Template, Task, TaskRemark, PublicHoliday, RegulatoryPublication
 from .forms import (
@@ -31,14 +35,27 @@ from .forms import (
     PublicationForm,
 )
 from .tables import (
+    TASK_TABLE_FIELDS,
     TemplatesTable,
     TaskTable,
     TaskApprovalTable,
     PublicHolidayTable,
     PublicationTable,
+    TaskRowRenderer,
 )
 
-from .utils import calculate_due_date, calculate_conditional_board_meeting_due_date
+from .archive import audit_history
+from .counters import task_counts_scope, task_scope_version
+from .downloads import serve_file
+from .exports import EXPORT_FORMATS, csv_response, xlsx_response
+from .pagination import keyset_page
+from .permissions import permission_profile
+from .transitions import APPLIED, apply_transition
+from .utils import (
+    holiday_calendar,
+    recompute_working_due_dates,
+    set_board_meeting_dates,
+)
 
 
 class PublicHolidayList(LoginRequiredMixin, PermissionRequiredMixin, SingleTableView):
@@ -258,12 +275,12 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     #     return super().dispatch(request, *args, **kwargs)
 
     def get_form_class(self):
-        user = self.request.user
+        profile = permission_profile(self.request.user)
 
-        if user.has_perm("compliance.can_edit_as_department"):
+        if profile.edit_as_department:
             return DepartmentTaskForm
 
-        if user.has_perm("compliance.can_edit_as_compliance"):
+        if profile.edit_as_compliance:
             return ComplianceTaskForm
 
         raise PermissionDenied
@@ -272,14 +289,14 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
         """
         Returns a different template name based on the user's role.
         """
-        user = self.request.user
+        profile = permission_profile(self.request.user)
 
         # if user.user_type in self.DEPT_RESTRICTED_USERS:
         # if user.in_groups(*self.DEPT_RESTRICTED_GROUPS):
-        if user.has_perm("compliance.can_edit_as_department"):
+        if profile.edit_as_department:
             return ["task_upload_dept.html"]
 
-        if user.has_perm("compliance.can_edit_as_compliance"):
+        if profile.edit_as_compliance:
             return ["task_upload_compliance.html"]
 
         raise PermissionDenied
@@ -289,17 +306,6 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        task_ct = ContentType.objects.get_for_model(Task)
-        task = self.object
-        context["status_audit_logs"] = (
-            LogEntry.objects.filter(
-                content_type=task_ct,
-                object_id=str(task.pk),
-                changes__has_key="current_status",
-            )
-            .select_related("actor")
-            .order_by("-timestamp")
-        )
         if self.request.POST:
             context["remarks_formset"] = TaskRemarkFormSet(
                 self.request.POST,
@@ -320,15 +326,17 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
         if remarks_formset.is_valid():
             self.object = form.save(commit=False)
 
+            profile = permission_profile(self.request.user)
+
             # if self.request.user.user_type in self.DEPT_RESTRICTED_USERS:
-            if self.request.user.has_perm("compliance.can_edit_as_department"):
+            if profile.edit_as_department:
                 data_doc = form.cleaned_data.get("data_document")
 
                 if data_doc:
                     self.object.current_status = "to_be_approved"
 
             # if self.request.user.user_type in self.COMPLIANCE_DEPT_USERS:
-            if self.request.user.has_perm("compliance.can_edit_as_compliance"):
+            if profile.edit_as_compliance:
                 inbound_email = form.cleaned_data.get("inbound_email_communication")
                 outbound_email = form.cleaned_data.get("outbound_email_communication")
                 outbound_data = form.cleaned_data.get("outbound_data_document")
@@ -350,6 +358,67 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
             return self.form_invalid(form)
 
 
+def task_scope(request):
+    """The task scope (counters, version token) the user's lists belong to."""
+    profile = permission_profile(request.user)
+    return task_counts_scope(
+        profile.department_id, unscoped=not profile.department_scoped
+    )
+
+
+def task_page_etag(request, *fingerprint):
+    """
+    ETag of a rendered task page. Besides the page's own fingerprint it
+    covers the version token of the user's task scope (which also drives
+    the sidebar counters), today's date (lists move on at midnight), the
+    user's permission profile and CSRF secret, and the URL.
+    """
+    parts = [
+        task_scope_version(task_scope(request)),
+        localdate().isoformat(),
+        repr(permission_profile(request.user)),
+        csrf_secret(request),
+        request.get_full_path(),
+        *fingerprint,
+    ]
+    return quote_etag(
+        hashlib.md5(
+            "|".join(map(str, parts)).encode(), usedforsecurity=False
+        ).hexdigest()
+    )
+
+
+def csrf_secret(request):
+    """The CSRF secret the rendered page's forms will carry."""
+    get_token(request)
+    return request.META["CSRF_COOKIE"]
+
+
+def not_modified(request, etag, last_modified):
+    """
+    A 304 response when the client's copy is still current, else None.
+    Pages with pending flash messages are always rendered.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 class TaskDetailView(LoginRequiredMixin, DetailView):
     model = Task
     template_name = "task_detail.html"
@@ -365,18 +434,22 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
                 "created_by",
                 "updated_by",
                 "department",
-                "template",
-            )
-            .prefetch_related(
-                Prefetch(
-                    "remarks",
-                    queryset=TaskRemark.objects.select_related("created_by").order_by(
-                        "created_at"
-                    ),
-                )
             )
         )
 
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        last_modified = self.object.updated_on
+        etag = task_page_etag(request, last_modified)
+
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            context = self.get_context_data(object=self.object)
+            response = set_validators(
+                self.render_to_response(context), etag, last_modified
+            )
+        return response
+
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
 
@@ -399,43 +472,157 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
         task = self.object
         user = self.request.user
 
-        if not task.template_id:
-            qs = Task.objects.none()
-        else:
-            qs = (
-                Task.objects.select_related("department")
-                .filter(template_id=task.template_id)
-                .exclude(id=task.id)
-                .order_by("due_date")
+        # The related tasks, remarks and status history panels are fetched
+        # separately (see task_panel) once the page is shown
+        # context["can_request_revision"] = task.can_request_revision(user)
+        # context["can_mark_as_pending"] = task.can_mark_as_pending(user)
+        # context["can_edit"] = task.can_edit(user)
+        context.update(task.permission_context(user))
+        if context["can_mark_as_pending"] or context["can_request_revision"]:
+            context["revision_form"] = TaskRemarksForm(
+                help_text="Please explain why revision is required."
+            )
+        if context["can_mark_as_pending"]:
+            context["approval_form"] = TaskRemarksForm(
+                help_text="Remarks for approval."
             )
+        if task.current_status != "submitted":
+            context["remarks_form"] = TaskRemarksForm(help_text="Add remarks.")
 
-        table = TaskTable(qs)
-        RequestConfig(self.request, paginate={"per_page": 100}).configure(table)
+        return context
 
-        context["related_task_table"] = table
 
-        task_ct = ContentType.objects.get_for_model(Task)
+# Panels of the task detail page loaded by htmx after first paint
+TASK_PANEL_TEMPLATES = {
+    "related": "partials/related_items.html",
+    "remarks": "partials/task_remarks.html",
+    "history": "partials/task_status_history.html",
+}
+TASK_PANEL_TIMEOUT = 60 * 60 * 24
+
+
+def related_tasks(task):
+    if not task.template_id:
+        return Task.objects.none()
+    return (
+        Task.objects.select_related("department")
+        .only(*TASK_TABLE_FIELDS)
+        .filter(template_id=task.template_id)
+        .exclude(id=task.id)
+        .order_by("due_date")
+    )
 
-        context["status_audit_logs"] = (
-            LogEntry.objects.filter(
-                content_type=task_ct,
-                object_id=str(task.pk),
-                changes__has_key="current_status",
-            )
-            .select_related("actor")
-            .order_by("-timestamp")
-        )
-        # context["can_request_revision"] = task.can_request_revision(user)
-        # context["can_mark_as_pending"] = task.can_mark_as_pending(user)
-        # context["can_edit"] = task.can_edit(user)
-        context.update(task.permission_context(user))
-        context["revision_form"] = TaskRemarksForm(
-            help_text="Please explain why revision is required."
+
+def task_panel_version(task, panel):
+    """A cheap aggregate that changes whenever the panel's content does."""
+    if panel == "related":
+        return related_tasks(task).aggregate(Count("id"), Max("updated_on"))
+    if panel == "remarks":
+        return task.remarks.aggregate(Count("id"), Max("id"))
+    return task.status_transitions.aggregate(Count("id"), Max("id"))
+
+
+def task_panel_context(request, task, panel):
+    if panel == "related":
+        table = TaskTable(related_tasks(task))
+        RequestConfig(request, paginate={"per_page": 100}).configure(table)
+        return {"related_task_table": table}
+    if panel == "remarks":
+        return {
+            "remarks": task.remarks.select_related("created_by").order_by("created_at")
+        }
+    return {
+        "status_transitions": task.status_transitions.select_related("actor").order_by(
+            "-timestamp"
         )
-        context["approval_form"] = TaskRemarksForm(help_text="Remarks for approval.")
-        context["remarks_form"] = TaskRemarksForm(help_text="Add remarks.")
+    }
+
+
+@login_required
+def task_panel(request, pk, panel):
+    """
+    One lazily loaded panel of the task detail page. Responses carry an
+    ETag derived from the panel's data, and the rendered HTML is cached
+    under it, so unchanged panels cost one aggregate query (or a 304).
+    """
+    if panel not in TASK_PANEL_TEMPLATES:
+        raise Http404
+    task = get_object_or_404(
+        Task.objects.only("department_id", "current_status", "template_id"), pk=pk
+    )
+    if not task.can_view(request.user):
+        raise PermissionDenied("You are not allowed to view this task.")
+
+    version = task_panel_version(task, panel)
+    etag = quote_etag(
+        hashlib.md5(
+            f"{panel}:{task.pk}:{version}:{request.GET.urlencode()}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f"compliance:task_panel:{etag}"
+        content = cache.get(key)
+        if content is None:
+            content = render_to_string(
+                TASK_PANEL_TEMPLATES[panel],
+                {"task": task, **task_panel_context(request, task, panel)},
+                request,
+            )
+            cache.set(key, content, TASK_PANEL_TIMEOUT)
+        response = HttpResponse(content)
+    response.headers["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
-        return context
+
+TASK_DOCUMENT_FIELDS = {
+    "circular_document",
+    "inbound_email_communication",
+    "outbound_email_communication",
+    "data_document_template",
+    "data_document",
+    "outbound_data_document",
+}
+
+
+@login_required
+def task_document(request, pk, field):
+    """
+    Download one of a task's documents. Only users who may view the task
+    get it; the transfer itself is handed to the web server.
+    """
+    if field not in TASK_DOCUMENT_FIELDS:
+        raise Http404
+    task = get_object_or_404(Task.objects.only("department_id", field), pk=pk)
+    if not task.can_view(request.user):
+        raise PermissionDenied("You are not allowed to view this task.")
+
+    document = getattr(task, field)
+    if not document:
+        raise Http404("The task has no such document.")
+    return serve_file(request, document)
+
+
+TEMPLATE_DOCUMENT_FIELDS = {"circular_document", "data_document_template"}
+
+
+@login_required
+@permission_required("compliance.view_template", raise_exception=True)
+def template_document(request, pk, field):
+    """
+    Download one of a template's documents. They share their upload folders
+    with the tasks' copies, so they cannot be served from MEDIA_URL either.
+    """
+    if field not in TEMPLATE_DOCUMENT_FIELDS:
+        raise Http404
+    template = get_object_or_404(Template.objects.only(field), pk=pk)
+
+    document = getattr(template, field)
+    if not document:
+        raise Http404("The template has no such document.")
+    return serve_file(request, document)
 
 
 class TemplateListView(LoginRequiredMixin, PermissionRequiredMixin, SingleTableView):
@@ -455,6 +642,11 @@ class TemplateListView(LoginRequiredMixin, PermissionRequiredMixin, SingleTableV
         )
 
 
+# Safety net only: the scope version in the key changes whenever a task of
+# the scope does, and the date in the key rolls lists over at midnight.
+TASK_LIST_FRAGMENT_TIMEOUT = 60 * 60
+
+
 class BaseTaskListView(LoginRequiredMixin, PermissionRequiredMixin, SingleTableView):
     model = Task
     table_class = TaskTable
@@ -481,8 +673,201 @@ class BaseTaskListView(LoginRequiredMixin, PermissionRequiredMixin, SingleTableV
         "public_disclosure",
     ]
 
+    # Rows are paged server-side through the DataTables ajax protocol. The
+    # HTML page only carries the first page, the rest is fetched as JSON.
+    page_length = 25
+    max_page_length = 500
+    ORDERING_FIELDS = {
+        "type_of_compliance": "type_of_compliance",
+        "department": "department__department_name",
+        "task_name": "task_name",
+        "current_status": "current_status",
+        "priority": "priority",
+        "due_date": "due_date",
+        "data_document": "data_document",
+        "date_of_document_forwarded": "date_of_document_forwarded",
+    }
+    SEARCH_FIELDS = [
+        "task_name",
+        "department__department_name",
+        "type_of_compliance",
+        "current_status",
+        "return_number",
+    ]
+
+    def get(self, request, *args, **kwargs):
+        if "draw" in request.GET:
+            return JsonResponse(self.get_datatables_data(request.GET))
+        export_format = request.GET.get("export")
+        if export_format in EXPORT_FORMATS:
+            return self.export(export_format)
+
+        self.records_total, last_modified = self.fingerprint()
+        etag = task_page_etag(request, self.records_total, last_modified)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(
+                super().get(request, *args, **kwargs), etag, last_modified
+            )
+        return response
+
+    def fingerprint(self):
+        """Row count and latest change of the list, from its indexes only."""
+        fingerprint = (
+            self.get_queryset()
+            .order_by()
+            .aggregate(count=Count("id"), last_modified=Max("updated_on"))
+        )
+        return fingerprint["count"], fingerprint["last_modified"]
+
+    def export(self, export_format):
+        """Stream every task of this list (not just one page) as a file."""
+        name_parts = [
+            self.kwargs.get("filter") or self.status or "tasks",
+            self.kwargs.get("recurrence", "all"),
+            localdate().isoformat(),
+        ]
+        filename = "-".join(["tasks", *name_parts])
+        if export_format == "csv":
+            return csv_response(self.get_queryset(), filename)
+        return xlsx_response(self.get_queryset(), filename)
+
+    def get_table_data(self):
+        rows, self.next_cursor, _ = keyset_page(self.get_queryset(), self.page_length)
+        return rows
+
+    def get_table_kwargs(self):
+        # Rows arrive already ordered (and sliced) from the database
+        return {"order_by": ()}
+
+    def get_datatables_data(self, params):
+        """
+        Answer one DataTables server-side request (draw/start/length/order/
+        search) with a single page of rendered table cells.
+        """
+        qs = self.get_queryset()
+        records_total = self.cached_count(qs)
+
+        search = params.get("search[value]", "").strip()
+        if search:
+            condition = Q()
+            for field in self.SEARCH_FIELDS:
+                condition |= Q(**{f"{field}__icontains": search})
+            qs = qs.filter(condition)
+            records_filtered = self.cached_count(qs, search)
+        else:
+            records_filtered = records_total
+
+        start = max(self._int_param(params, "start", 0), 0)
+        length = self._int_param(params, "length", self.page_length)
+        if not 0 < length <= self.max_page_length:
+            length = self.max_page_length
+
+        table_class = self.get_table_class()
+        ordering = self.get_datatables_ordering(params, table_class)
+        if ordering == ["due_date"]:
+            # Default order: page on the (due_date, priority, id) keyset, using
+            # the cursor of the adjacent page when the client sends one
+            rows, next_cursor, prev_cursor = keyset_page(
+                qs,
+                length,
+                after=params.get("after"),
+                before=params.get("before"),
+                offset=start,
+            )
+        else:
+            rows = qs.order_by(*ordering, "id")[start : start + length]
+            next_cursor = prev_cursor = None
+
+        return {
+            "draw": self._int_param(params, "draw", 0),
+            "recordsTotal": records_total,
+            "recordsFiltered": records_filtered,
+            "next": next_cursor,
+            "previous": prev_cursor,
+            "data": TaskRowRenderer(table_class).rows(rows),
+        }
+
+    def get_datatables_ordering(self, params, table_class):
+        column_names = [column.name for column in table_class([]).columns]
+        ordering = []
+        i = 0
+        while f"order[{i}][column]" in params:
+            index = self._int_param(params, f"order[{i}][column]", -1)
+            if 0 <= index < len(column_names):
+                field = self.ORDERING_FIELDS.get(column_names[index])
+                if field:
+                    descending = params.get(f"order[{i}][dir]") == "desc"
+                    ordering.append(f"-{field}" if descending else field)
+            i += 1
+        return ordering or ["due_date"]
+
+    @staticmethod
+    def _int_param(params, key, default):
+        try:
+            return int(params.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def list_cache_key(self, prefix, variant):
+        """Cache key of something derived from this list, per `variant`."""
+        scope = task_scope(self.request)
+        return ":".join(
+            [
+                prefix,
+                scope,
+                task_scope_version(scope),
+                type(self).__name__,
+                self.status or "",
+                self.date_filter or "",
+                self.kwargs.get("recurrence", "all"),
+                localdate().isoformat(),
+                hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest(),
+            ]
+        )
+
+    def table_fragment_key(self):
+        return self.list_cache_key("compliance:task_list", self.request.GET.urlencode())
+
+    def cached_count(self, qs, search=""):
+        """
+        Row count of `qs`, the list filtered by `search`. Every page of a
+        list needs it, so it is counted once and cached like the table
+        fragment instead of on each page request.
+        """
+        return cache.get_or_set(
+            self.list_cache_key("compliance:task_list_count", search),
+            qs.count,
+            TASK_LIST_FRAGMENT_TIMEOUT,
+        )
+
+    def table_fragment(self):
+        """
+        The rendered first page of the table with its row total and cursor.
+
+        The rows only depend on the user's task scope, so the fragment is
+        cached per scope and list and shared by every user of the scope: the
+        first one to open a list renders it, the rest reuse it until a task
+        of the scope changes.
+        """
+        key = self.table_fragment_key()
+        fragment = cache.get(key)
+        if fragment is None:
+            table = self.get_table(**self.get_table_kwargs())
+            fragment = {
+                "table_html": table.as_html(self.request),
+                "records_total": self.records_total,
+                "next_cursor": self.next_cursor,
+            }
+            cache.set(key, fragment, TASK_LIST_FRAGMENT_TIMEOUT)
+        return fragment
+
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+        # Skips SingleTableMixin, which would query and build the table on
+        # every request; table_fragment() only does so on a cache miss
+        context = super(SingleTableMixin, self).get_context_data(**kwargs)
+        context.update(self.table_fragment())
+        context["page_length"] = self.page_length
         context["recurrence_type"] = self.kwargs.get("recurrence", "all")
         context["recurrence_choices"] = self.RECURRENCE_CHOICES
         context["recurrence_url_name"] = self.recurrence_url_name
@@ -491,11 +876,11 @@ class BaseTaskListView(LoginRequiredMixin, PermissionRequiredMixin, SingleTableV
         return context
 
     def base_queryset(self):
-        qs = Task.objects.select_related("department")
-        user = self.request.user
+        qs = Task.objects.select_related("department").only(*TASK_TABLE_FIELDS)
+        profile = permission_profile(self.request.user)
 
-        if user.has_perm("compliance.can_edit_as_department") and not user.is_superuser:
-            qs = qs.filter(department=user.department)
+        if profile.department_scoped:
+            qs = qs.filter(department_id=profile.department_id)
 
         return qs
 
@@ -562,28 +947,28 @@ class TaskApprovalPendingListView(BaseTaskListView):
             return redirect(request.path)
 
         transitions = {
-            "approve": ("review", "approved and moved to Review"),
-            "send_back": ("pending", "sent back to Pending"),
+            "approve": "approved and moved to Review",
+            "send_back": "sent back to Pending",
         }
 
         if action not in transitions:
             messages.error(request, "Invalid action.")
             return redirect(request.path)
 
-        new_status, message = transitions[action]
-
-        tasks = Task.objects.filter(
-            id__in=task_ids,
-            current_status=self.status,
+        outcomes = apply_transition(
+            action,
+            [task_id for task_id in task_ids if task_id.isdigit()],
+            queryset=self.base_queryset(),
+            actor=request.user,
         )
-        updated = 0
-        with set_actor(request.user):
-            for task in tasks:
-                task.current_status = new_status
-                task.date_of_document_received = localdate()
-                task.save(update_fields=["current_status", "date_of_document_received"])
-                updated += 1
-        messages.success(request, f"{updated} task(s) {message}.")
+        updated = sum(outcome == APPLIED for outcome in outcomes.values())
+        messages.success(request, f"{updated} task(s) {transitions[action]}.")
+        skipped = len(outcomes) - updated
+        if skipped:
+            messages.warning(
+                request,
+                f"{skipped} task(s) skipped as they are no longer awaiting approval.",
+            )
         return redirect(request.path)
 
 
@@ -661,15 +1046,32 @@ def upload_public_holidays(request):
                     for _, row in df.iterrows()
                 ]
 
+                uploaded_dates = {holiday.date_of_holiday for holiday in holidays}
+                existing_dates = set(
+                    PublicHoliday.objects.filter(
+                        date_of_holiday__in=uploaded_dates
+                    ).values_list("date_of_holiday", flat=True)
+                )
+
                 PublicHoliday.objects.bulk_create(
                     holidays,
                     ignore_conflicts=True,  # avoids duplicate dates
                 )
+                # bulk_create skips post_save, so refresh the calendar here
+                holiday_calendar.invalidate()
+                recomputed = recompute_working_due_dates(
+                    uploaded_dates - existing_dates
+                )
 
                 messages.success(
                     request,
                     f"{len(holidays)} holidays imported successfully",
                 )
+                if recomputed:
+                    messages.info(
+                        request,
+                        f"Due date of {recomputed} pending task(s) recalculated",
+                    )
 
                 return redirect("upload_public_holidays")
 
@@ -810,6 +1212,25 @@ def task_add_remarks(request, pk):
         return HttpResponseForbidden("Invalid request")
 
 
+@login_required
+def task_audit_history(request, pk):
+    task = get_object_or_404(Task, pk=pk)
+    if not task.can_view(request.user):
+        raise PermissionDenied("You are not allowed to view this task.")
+
+    # The archive is only read when explicitly asked for
+    include_archived = request.GET.get("archived") == "1"
+    return render(
+        request,
+        "task_audit_history.html",
+        {
+            "task": task,
+            "entries": audit_history(task, include_archived=include_archived),
+            "include_archived": include_archived,
+        },
+    )
+
+
 @login_required
 @permission_required("compliance.can_edit_as_compliance", raise_exception=True)
 def bulk_set_board_meeting_date(request):
@@ -819,7 +1240,7 @@ def bulk_set_board_meeting_date(request):
     form = BoardMeetingBulkForm(request.POST)
     task_ids_raw = request.POST.get("task_ids", "")
 
-    task_ids = [pk for pk in task_ids_raw.split(",") if pk]
+    task_ids = [pk for pk in task_ids_raw.split(",") if pk.isdigit()]
 
     if not task_ids or not form.is_valid():
         messages.error(request, "Invalid submission.")
@@ -827,37 +1248,8 @@ def bulk_set_board_meeting_date(request):
 
     board_date = form.cleaned_data["board_meeting_date"]
 
-    tasks = Task.objects.filter(
-        id__in=task_ids,
-        template__type_of_due_date__in=["board_meeting"],
-        board_meeting_date_flag=False,
-    )
-
-    for task in tasks:
-        task.board_meeting_date = board_date
-        task.due_date = calculate_due_date(
-            type_of_due_date="board_meeting",
-            meeting_date=board_date,
-            due_date_days=task.template.due_date_days,
-        )
-        task.board_meeting_date_flag = True
-        task.save(
-            update_fields=["board_meeting_date", "due_date", "board_meeting_date_flag"]
-        )
-
-    conditional_tasks = Task.objects.filter(
-        id__in=task_ids,
-        template__type_of_due_date__in=["board_meeting_conditional"],
-        board_meeting_date_flag=False,
-    )
-    for task in conditional_tasks:
-        task.board_meeting_date = board_date
-        task.due_date = calculate_conditional_board_meeting_due_date(task)
-        task.board_meeting_date_flag = True
-        task.save(
-            update_fields=["board_meeting_date", "due_date", "board_meeting_date_flag"]
-        )
-    messages.success(request, f"{tasks.count()} task(s) updated.")
+    updated = set_board_meeting_dates(task_ids, board_date)
+    messages.success(request, f"{updated} task(s) updated.")
     return redirect("task_list_board_meeting_pending")
 
 
@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """
+    Run against a per-process in-memory cache instead of the shared Redis
+    one, emptied for every test: cached values outlive the per-test database
+    rollback.
+    """
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
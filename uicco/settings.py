@@ -62,6 +62,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "auditlog.middleware.AuditlogMiddleware",
+    "compliance.middleware.AuditActorMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
 ]
@@ -129,6 +130,7 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 AUTH_USER_MODEL = "accounts.CustomUser"
+AUTHENTICATION_BACKENDS = ["accounts.backends.CachedModelBackend"]
 
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = reverse_lazy("task_list", args=["overdue"])
@@ -160,11 +162,41 @@ STATIC_ROOT = BASE_DIR / "static_root"
 MEDIA_URL = "/media/"
 # MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_ROOT = Path("/var/www/media/")
+# Archived audit log entries (see archive_auditlog); kept outside MEDIA_ROOT,
+# which is served publicly
+AUDITLOG_ARCHIVE_ROOT = Path("/var/www/auditlog_archive/")
+# Uploads are stored once per distinct content and hard linked under their
+# names (see compliance.storage); `manage.py dedupe_media` converts
+# existing files
+STORAGES = {
+    "default": {"BACKEND": "compliance.storage.DeduplicatingFileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+# Task documents are downloaded through a permission-checked view that hands
+# the transfer to the web server: "X-Accel-Redirect" for nginx, which needs an
+# `internal` location at SENDFILE_URL aliasing MEDIA_ROOT, or "X-Sendfile"
+# for Apache/lighttpd. None streams the file from Django (development).
+SENDFILE_HEADER = None if DEBUG else "X-Accel-Redirect"
+SENDFILE_URL = "/protected-media/"
 BOOTSTRAP5 = {
     "css_url": {"url": "/static/bootstrap/css/bootstrap.min.css"},
     "javascript_url": {"url": "/static/bootstrap/js/bootstrap.bundle.min.js"},
 }
 
+# Shared by every gunicorn worker and the run_scheduler process, so an
+# invalidation made by one of them (sidebar counters, holiday calendar,
+# permissions, cached task lists) is seen by all. Kept in Redis rather than
+# the database: a cache hit must not cost a query.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+        "KEY_PREFIX": "uicco",
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
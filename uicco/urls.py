@@ -30,5 +30,10 @@ urlpatterns = [
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Only regulatory publications are public: task and template documents, and
+# the .blobs they are linked to, go through their permission-checked views
+urlpatterns += static(
+    settings.MEDIA_URL + "regulatory_publication/",
+    document_root=settings.MEDIA_ROOT / "regulatory_publication",
+)
 urlpatterns += debug_toolbar_urls()